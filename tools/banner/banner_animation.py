@@ -0,0 +1,385 @@
+"""
+Animated banners for make_banner.py (--animate)
+
+A looping background (drifting ramp and/or moving highlight) under the static text
+and logo, streamed frame by frame into animated WebP, APNG, GIF or numbered PNGs.
+"""
+from __future__ import annotations
+
+import io
+import math
+import os
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from PIL import Image, ImageFilter
+
+from make_banner import (
+    ANIMATION_FORMATS,
+    ANIMATION_MOTIONS,
+    DEFAULT_MARGIN,
+    ENCODING_PROFILES,
+    SIZE,
+    TEXT_COLOR,
+    THEMES,
+    EncodingProfile,
+    LogoAsset,
+    TextLayout,
+    _composite_clipped,
+    _resolve_engine,
+    _stage,
+    _vignette_rings,
+    _vignette_rings_pil,
+    banner_colors,
+    composite_logo,
+    darken_background,
+    get_logo_asset,
+    get_text_layer,
+    internal_background_size,
+    layout_text,
+    lerp_color,
+    logo_width,
+    resolve_encoding,
+    vignette_blur_radius,
+)
+
+
+HIGHLIGHT_DRIFT = 0.12  # highlight travel as a fraction of the canvas width/height
+
+
+class BackgroundAnimator:
+    """Per-frame banner backgrounds for a seamless loop, built from precomputed layers.
+
+    The highlight rings are drawn and blurred once on a canvas padded by the travel
+    distance; each frame resamples a moving window of that mask straight to the
+    output size (sub-pixel motion, no per-frame blur). The drifting ramp is a window
+    into a mirrored start->end->start ramp. Frame 0 matches the static layout.
+    """
+
+    def __init__(self, size: Tuple[int, int], start: Tuple[int, int, int], end: Tuple[int, int, int], n_frames: int, motion: str = "both", dark: bool = False, engine: str = "auto", quality: str = "standard"):
+        if motion not in ANIMATION_MOTIONS:
+            raise ValueError(f"Unknown motion: {motion!r} (expected one of {', '.join(ANIMATION_MOTIONS)})")
+        self.size = tuple(size)
+        self.start, self.end = start, end
+        self.n_frames = max(1, n_frames)
+        self.motion = motion
+        self.dark = dark
+        w, h = internal_background_size(self.size, quality)
+        self._inner = (w, h)
+        self._pad = (round(w * HIGHLIGHT_DRIFT), round(h * HIGHLIGHT_DRIFT)) if motion != "drift" else (0, 0)
+        px, py = self._pad
+        center, max_r = (int(w * 0.2) + px, int(h * 0.3) + py), int(math.hypot(w, h) * 0.6)
+        with _stage("animation.highlight"):
+            if _resolve_engine(engine) == "numpy":
+                rings = Image.fromarray(_vignette_rings(w + 2 * px, h + 2 * py, center, max_r), mode="L")
+            else:
+                rings = _vignette_rings_pil(w + 2 * px, h + 2 * py, center, max_r)
+            self._highlight = rings.filter(ImageFilter.GaussianBlur(vignette_blur_radius((w, h))))
+        self._white = Image.new("RGB", self.size, (255, 255, 255))
+
+    def _ramp(self, phase: float) -> Image.Image:
+        w = self.size[0]
+        shift = 2 * phase if self.motion != "highlight" else 0.0
+        row = []
+        for x in range(w):
+            u = (x / max(1, (w - 1)) + shift) % 2
+            row.append(lerp_color(self.start, self.end, u if u <= 1 else 2 - u))
+        ramp = Image.new("RGB", (w, 1))
+        ramp.putdata(row)
+        return ramp.resize(self.size, Image.NEAREST)
+
+    def frame(self, index: int) -> Image.Image:
+        """RGB background of frame ``index``."""
+        phase = (index % self.n_frames) / self.n_frames
+        (w, h), (px, py) = self._inner, self._pad
+        # Figure-eight around the resting position, back to it at the end of the loop
+        ox = px - px * math.sin(2 * math.pi * phase)
+        oy = py - py * math.sin(4 * math.pi * phase)
+        with _stage("animation.background"):
+            mask = self._highlight.resize(self.size, Image.BILINEAR, box=(ox, oy, ox + w, oy + h))
+            bg = Image.composite(self._white, self._ramp(phase), mask)
+            if self.dark:
+                bg = darken_background(bg)
+        return bg
+
+
+def render_foreground(size: Tuple[int, int], layout: TextLayout, logo: Optional[Tuple[Image.Image, Image.Image]], margin: int) -> Image.Image:
+    """Text (with shadow) and logo on a transparent RGBA canvas, to lay over changing backgrounds."""
+    fg = Image.new("RGBA", size, (0, 0, 0, 0))
+    texts = ((layout.title, layout.title_font, (2, 3), layout.title_xy), (layout.subtitle, layout.subtitle_font, (1, 2), layout.subtitle_xy))
+    for text, font, shadow_offset, (x, y) in texts:
+        layer = get_text_layer(text, font, shadow_offset, layout.shadow)
+        for color, mask, (ox, oy) in (((0, 0, 0), layer.shadow, layer.shadow_offset), (TEXT_COLOR, layer.mask, layer.offset)):
+            ink = Image.new("RGBA", mask.size, color)
+            ink.putalpha(mask)
+            _composite_clipped(fg, ink, (x + ox, y + oy))
+    if logo:
+        composite_logo(fg, logo[0], logo[1], margin)
+    return fg
+
+
+def iter_animation_frames(animator: BackgroundAnimator, foreground: Image.Image) -> Iterator[Image.Image]:
+    """Lazily yield the RGB frames: each background with the cached foreground pasted over it."""
+    bbox = foreground.getbbox()
+    overlay = foreground.crop(bbox) if bbox else None
+    for index in range(animator.n_frames):
+        frame = animator.frame(index)
+        if overlay is not None:
+            with _stage("animation.composite"):
+                frame.paste(overlay, bbox[:2], overlay)
+        yield frame
+
+
+def _riff_chunks(data: bytes, offset: int = 12) -> Iterator[Tuple[bytes, bytes]]:
+    while offset + 8 <= len(data):
+        fourcc, size = data[offset:offset + 4], int.from_bytes(data[offset + 4:offset + 8], "little")
+        yield fourcc, data[offset + 8:offset + 8 + size]
+        offset += 8 + size + (size & 1)
+
+
+def _png_chunks(data: bytes) -> Iterator[Tuple[bytes, bytes]]:
+    offset = 8
+    while offset + 8 <= len(data):
+        size = int.from_bytes(data[offset:offset + 4], "big")
+        yield data[offset + 4:offset + 8], data[offset + 8:offset + 8 + size]
+        offset += 12 + size
+
+
+def _gif_sub_blocks(data: bytes, offset: int) -> int:
+    # Offset just past a chain of GIF data sub-blocks (and its 0 terminator)
+    while data[offset]:
+        offset += data[offset] + 1
+    return offset + 1
+
+
+class AnimationWriter:
+    """Streams frames into an animated WebP, APNG or GIF, or a numbered PNG sequence.
+
+    Each frame is encoded on its own with Pillow's still-image encoder and its
+    compressed data is appended to the animation container right away, so only the
+    current raw frame is in memory (Pillow's save_all keeps every frame). Files are
+    written under a temporary name and moved into place by ``close()``; ``abort()``
+    removes the partial file instead. As a context manager the writer closes on
+    success and aborts when the block raises.
+    """
+
+    def __init__(self, path: str, fmt: str, size: Tuple[int, int], n_frames: int, fps: float = 12.0, loop: int = 0, profile: EncodingProfile = ENCODING_PROFILES["default"]):
+        if fmt not in ANIMATION_FORMATS:
+            raise ValueError(f"Unknown animation format: {fmt!r} (expected one of {', '.join(ANIMATION_FORMATS)})")
+        self.path = path
+        self.fmt = fmt
+        self.size = tuple(size)
+        self.n_frames = n_frames
+        self.delay_ms = max(1, round(1000 / fps))
+        self.loop = loop
+        self.profile = profile
+        self.count = 0
+        self._seq = 0
+        if fmt == "frames":
+            os.makedirs(path, exist_ok=True)
+            self._fh = None
+            return
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = path + ".part"
+        self._fh = open(self._tmp_path, "wb")
+        try:
+            self._write_header()
+        except BaseException:
+            self.abort()
+            raise
+
+    def __enter__(self) -> "AnimationWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _write_header(self) -> None:
+        w, h = self.size
+        if self.fmt == "webp":
+            vp8x = bytes([0x02, 0, 0, 0]) + (w - 1).to_bytes(3, "little") + (h - 1).to_bytes(3, "little")
+            anim = bytes(4) + self.loop.to_bytes(2, "little")  # background color, loop count
+            self._fh.write(b"RIFF" + bytes(4) + b"WEBP")
+            self._chunk_le(b"VP8X", vp8x)
+            self._chunk_le(b"ANIM", anim)
+        elif self.fmt == "gif":
+            self._fh.write(b"GIF89a" + w.to_bytes(2, "little") + h.to_bytes(2, "little") + bytes(3))
+            self._fh.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01" + self.loop.to_bytes(2, "little") + b"\x00")
+
+    def _chunk_le(self, fourcc: bytes, payload: bytes) -> None:
+        self._fh.write(fourcc + len(payload).to_bytes(4, "little") + payload + (b"\x00" if len(payload) & 1 else b""))
+
+    def _chunk_png(self, fourcc: bytes, payload: bytes) -> None:
+        self._fh.write(len(payload).to_bytes(4, "big") + fourcc + payload + zlib.crc32(fourcc + payload).to_bytes(4, "big"))
+
+    def add(self, frame: Image.Image) -> None:
+        if frame.size != self.size:
+            raise ValueError(f"Frame size {frame.size} does not match the animation size {self.size}")
+        with _stage(f"animation.encode.{self.fmt}"):
+            getattr(self, f"_add_{self.fmt}")(frame)
+        self.count += 1
+
+    def _add_frames(self, frame: Image.Image) -> None:
+        frame.save(os.path.join(self.path, f"frame_{self.count + 1:04d}.png"), compress_level=self.profile.png_compress_level)
+
+    def _add_webp(self, frame: Image.Image) -> None:
+        buf = io.BytesIO()
+        frame.save(buf, format="WEBP", quality=self.profile.webp_quality, method=self.profile.webp_method)
+        data = b""
+        for fourcc, payload in _riff_chunks(buf.getvalue()):
+            if fourcc in (b"ALPH", b"VP8 ", b"VP8L"):
+                data += fourcc + len(payload).to_bytes(4, "little") + payload + (b"\x00" if len(payload) & 1 else b"")
+        w, h = self.size
+        # Frame at (0, 0), full canvas, no blending (bit 1) and no disposal
+        header = bytes(6) + (w - 1).to_bytes(3, "little") + (h - 1).to_bytes(3, "little") + self.delay_ms.to_bytes(3, "little") + b"\x02"
+        self._chunk_le(b"ANMF", header + data)
+
+    def _add_apng(self, frame: Image.Image) -> None:
+        buf = io.BytesIO()
+        frame.save(buf, format="PNG", compress_level=self.profile.png_compress_level)
+        chunks = list(_png_chunks(buf.getvalue()))
+        if self.count == 0:
+            self._fh.write(b"\x89PNG\r\n\x1a\n")
+            self._chunk_png(b"IHDR", dict(chunks)[b"IHDR"])
+            self._chunk_png(b"acTL", self.n_frames.to_bytes(4, "big") + self.loop.to_bytes(4, "big"))
+        w, h = self.size
+        fctl = self._seq.to_bytes(4, "big") + w.to_bytes(4, "big") + h.to_bytes(4, "big") + bytes(8)
+        fctl += self.delay_ms.to_bytes(2, "big") + (1000).to_bytes(2, "big") + b"\x00\x00"
+        self._chunk_png(b"fcTL", fctl)
+        self._seq += 1
+        for fourcc, payload in chunks:
+            if fourcc != b"IDAT":
+                continue
+            if self.count == 0:
+                self._chunk_png(b"IDAT", payload)
+            else:
+                self._chunk_png(b"fdAT", self._seq.to_bytes(4, "big") + payload)
+                self._seq += 1
+
+    def _add_gif(self, frame: Image.Image) -> None:
+        buf = io.BytesIO()
+        frame.quantize(256).save(buf, format="GIF")
+        data = buf.getvalue()
+        packed = data[10]
+        offset = 13
+        color_table = b""
+        if packed & 0x80:
+            color_table = data[offset:offset + 3 * 2 ** ((packed & 7) + 1)]
+            offset += len(color_table)
+        while data[offset] == 0x21:  # skip extensions
+            offset = _gif_sub_blocks(data, offset + 2)
+        descriptor = bytearray(data[offset:offset + 10])
+        end = offset + 10
+        if not descriptor[9] & 0x80 and color_table:
+            # Move the global table into the frame as a local one
+            descriptor[9] |= 0x80 | (packed & 7)
+        else:
+            color_table = b""
+        end = _gif_sub_blocks(data, end + 1)  # LZW minimum code size, then the image data
+        delay = max(1, round(self.delay_ms / 10))
+        self._fh.write(b"\x21\xf9\x04\x04" + delay.to_bytes(2, "little") + b"\x00\x00")
+        self._fh.write(bytes(descriptor) + color_table + data[offset + 10:end])
+
+    def close(self) -> str:
+        if self._fh is None or self._fh.closed:
+            return self.path
+        try:
+            if self.fmt == "webp":
+                size = self._fh.tell()
+                self._fh.seek(4)
+                self._fh.write((size - 8).to_bytes(4, "little"))
+            elif self.fmt == "apng":
+                self._chunk_png(b"IEND", b"")
+            elif self.fmt == "gif":
+                self._fh.write(b"\x3b")
+            self._fh.close()
+            if self.count != self.n_frames and self.fmt == "apng":
+                raise RuntimeError(f"{self.path}: expected {self.n_frames} frames, got {self.count}")
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        return self.path
+
+    def abort(self) -> None:
+        """Close the file and remove the partial output (frames of a sequence are kept)."""
+        if self._fh is None:
+            return
+        self._fh.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+def animation_path(output: str, fmt: str) -> str:
+    """Output path for ``fmt``: .webp/.png/.gif extension, or a <stem>_frames directory."""
+    base, _ = os.path.splitext(output)
+    if fmt == "frames":
+        return base + "_frames"
+    return base + {"webp": ".webp", "apng": ".png", "gif": ".gif"}[fmt]
+
+
+def build_animated_banner(
+    output: str,
+    title: str,
+    subtitle: str,
+    logo_path: Optional[str | LogoAsset] = None,
+    size: Tuple[int, int] = SIZE,
+    fmt: str = "webp",
+    frames: int = 48,
+    fps: float = 12.0,
+    motion: str = "both",
+    theme: str = "light",
+    margin: int = DEFAULT_MARGIN,
+    title_font_paths: Optional[list[str]] = None,
+    subtitle_font_paths: Optional[list[str]] = None,
+    palette_from_logo: bool = True,
+    logo_scale: float = 1.0,
+    subtitle_gap_factor: float = 1.35,
+    allow_upscale_logo: bool = True,
+    text_shift_ratio: float = 0.0,
+    text_shadow: str = "hard",
+    bg_engine: str = "auto",
+    quality: str = "standard",
+    encoding: str | EncodingProfile = "default",
+) -> str:
+    """Render a looping animated banner where only the background moves; returns the path written.
+
+    Text and logo are rendered once into a transparent foreground; the frames are
+    generated one at a time and encoded on a writer thread while the next frame is
+    rendered, so memory does not grow with ``frames``.
+    """
+    if theme not in THEMES:
+        raise ValueError(f"Unknown theme: {theme!r} (expected one of {', '.join(THEMES)})")
+    if frames < 1 or fps <= 0:
+        raise ValueError(f"Animations need at least one frame and a positive frame rate (got frames={frames}, fps={fps})")
+    logo = logo_path if isinstance(logo_path, LogoAsset) else get_logo_asset(logo_path)
+    start, end = banner_colors(logo, palette_from_logo)
+    layout = layout_text(size, title, subtitle, margin, title_font_paths, subtitle_font_paths, subtitle_gap_factor, text_shift_ratio, text_shadow)
+    variant = None
+    if logo is not None:
+        width = logo_width(size, logo_scale)
+        variant = logo.variant(width if allow_upscale_logo else min(width, logo.width))
+    foreground = render_foreground(size, layout, variant, margin)
+    animator = BackgroundAnimator(size, start, end, frames, motion=motion, dark=theme == "dark", engine=bg_engine, quality=quality)
+
+    pending: deque[Future] = deque()
+    # The writer outlives the encoder thread, and drops its partial file if a frame fails
+    with AnimationWriter(output, fmt, size, animator.n_frames, fps=fps, profile=resolve_encoding(encoding)) as writer:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="banner-animation") as executor:
+            for frame in iter_animation_frames(animator, foreground):
+                # Keep at most two frames queued for the encoder
+                while len(pending) >= 2:
+                    pending.popleft().result()
+                pending.append(executor.submit(copy_context().run, writer.add, frame))
+            while pending:
+                pending.popleft().result()
+    return writer.path
@@ -0,0 +1,524 @@
+"""
+Batch jobs and watch mode for make_banner.py (--batch, --watch)
+
+Expands a JSON/JSONL job matrix, plans the shared backgrounds, text layouts and
+logo layers once, and re-renders changed outputs while watching the inputs.
+"""
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import os
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+from make_banner import (
+    _TEXT_LAYERS,
+    DEFAULT_MARGIN,
+    FONT_EXTENSIONS,
+    PRESETS,
+    SIZE,
+    THEMES,
+    BackgroundWriter,
+    BuildManifest,
+    EncodingProfile,
+    _exif_bytes,
+    _file_digest,
+    _source_digest,
+    _stage,
+    banner_colors,
+    composite_logo,
+    darken_background,
+    draw_text_layout,
+    get_font_registry,
+    get_logo_asset,
+    layout_text,
+    logo_width,
+    make_linear_gradient,
+    scale_text_layout,
+    theme_path,
+)
+
+
+# Batch job keys (JSON/JSONL job files) and their defaults; other keys are free-form
+# fields available to the {placeholders} in "outdir" and "name"
+BATCH_DEFAULTS = {
+    "title": "Conecta Libras",
+    "subtitle": "Comunicação inclusiva sem barreiras",
+    "logo": None,
+    "margin": DEFAULT_MARGIN,
+    "title_font": [],
+    "subtitle_font": [],
+    "palette_from_logo": True,
+    "logo_scale": 1.0,
+    "subtitle_gap": 1.35,
+    "allow_upscale_logo": True,
+    "text_shift": 0.0,
+    "text_shadow": "hard",
+    "exif_artist": None,
+    "exif_copyright": None,
+    "exif_description": None,
+    "quality": "standard",
+    "bg_engine": "auto",
+    "preset": None,
+    "sizes": None,
+    "size": list(SIZE),
+    "name": "banner",
+    "themes": ["light"],
+    "outdir": "Exports_Batch",
+    "jpg": True,
+}
+
+
+def expand_batch(spec: dict | list, defaults: Optional[dict] = None) -> list[dict]:
+    """Expand a batch spec into one settings dict per job.
+
+    ``spec`` is a list of jobs or ``{"defaults": {...}, "matrix": {...}, "jobs": [...]}``.
+    Every job is crossed with each matrix axis; an axis value that is a dict is merged
+    into the job, any other value sets the key named after the axis. Precedence is
+    BATCH_DEFAULTS < ``defaults`` < spec defaults < job < matrix values.
+    """
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+    base = {**BATCH_DEFAULTS, **(defaults or {}), **spec.get("defaults", {})}
+    axes = list(spec.get("matrix", {}).items())
+    jobs = []
+    for job in spec.get("jobs") or [{}]:
+        for combo in itertools.product(*(values for _, values in axes)):
+            merged = dict(base, **job)
+            for (axis, _), value in zip(axes, combo):
+                merged.update(value if isinstance(value, dict) else {axis: value})
+            jobs.append(merged)
+    return jobs
+
+
+def load_batch_file(path: str | Path, defaults: Optional[dict] = None) -> list[dict]:
+    """Read a JSON batch spec, or JSONL with one job per line, and expand it (see expand_batch)."""
+    with open(path, "r", encoding="utf-8") as fh:
+        text = fh.read()
+    if str(path).endswith(".jsonl"):
+        spec = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        spec = json.loads(text)
+    return expand_batch(spec, defaults)
+
+
+def _batch_template(value: str, job: dict) -> str:
+    try:
+        return value.format_map(job)
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"Cannot fill {value!r} from the job fields: {e}")
+
+
+def _batch_themes(job: dict) -> list[str]:
+    # A single "theme" (e.g. from a matrix axis) wins over the "themes" list
+    themes = [job["theme"]] if job.get("theme") else job["themes"]
+    if isinstance(themes, str):
+        themes = themes.split(",")
+    themes = [t.strip().lower() for t in themes]
+    for theme in themes:
+        if theme not in THEMES:
+            raise ValueError(f"Unknown theme: {theme!r} (expected one of {', '.join(THEMES)})")
+    return themes
+
+
+def _batch_sizes(job: dict) -> list[Tuple[str, int, int, float]]:
+    if job["preset"]:
+        if job["preset"] not in PRESETS:
+            raise ValueError(f"Unknown preset: {job['preset']!r} (expected one of {', '.join(PRESETS)})")
+        return PRESETS[job["preset"]]
+    if job["sizes"]:
+        return [(name, int(w), int(h), float(rest[0]) if rest else 0.0) for name, w, h, *rest in job["sizes"]]
+    w, h = job["size"]
+    return [(_batch_template(job["name"], job), int(w), int(h), 0.0)]
+
+
+class BatchOutput(NamedTuple):
+    """One file pair of a batch run and the keys of the intermediates it is composed from."""
+
+    png: str
+    jpg: Optional[str]
+    background: tuple
+    text: tuple
+    logo: Optional[tuple]
+    margin: int
+    exif_bytes: Optional[bytes]
+
+    def deps(self) -> list[tuple]:
+        return [self.background, self.text] + ([self.logo] if self.logo else [])
+
+
+class BatchPlan:
+    """Outputs of a batch run plus the graph of shared intermediates they need.
+
+    Intermediates are keyed by exactly the inputs they depend on:
+    - ("background", size, colors, engine, quality): the light gradient
+    - ("dark", background key): the dark theme derived from it
+    - ("text", size, text, fonts, layout settings): the fitted TextLayout
+    - ("logo", logo file, width): the resized logo and its shadow
+    so each distinct one is computed once, however many outputs share it.
+    """
+
+    def __init__(self):
+        self.nodes: dict[tuple, Tuple[Callable, Tuple[tuple, ...]]] = {}
+        self.outputs: list[BatchOutput] = []
+
+    def node(self, key: tuple, compute: Callable, *deps: tuple) -> tuple:
+        if key not in self.nodes:
+            self.nodes[key] = (compute, deps)
+        return key
+
+    def counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for key in self.nodes:
+            counts[key[0]] = counts.get(key[0], 0) + 1
+        return counts
+
+    def add_job(self, job: dict) -> None:
+        themes = _batch_themes(job)
+        logo = None
+        if job["logo"]:
+            logo = get_logo_asset(job["logo"])
+            if logo is None:
+                raise ValueError(f"Logo not found or unreadable: {job['logo']}")
+        start, end = banner_colors(logo, job["palette_from_logo"])
+        outdir_template = str(job["outdir"])
+        exif_bytes = _exif_bytes(job["exif_artist"], job["exif_copyright"], job["exif_description"])
+        title_fonts = tuple(job["title_font"])
+        subtitle_fonts = tuple(job["subtitle_font"])
+
+        for name, w, h, shift in _batch_sizes(job):
+            size = (w, h)
+            shift_ratio = job["text_shift"] if job["text_shift"] else shift
+            background = self.node(("background", size, start, end, job["bg_engine"], job["quality"]), partial(make_linear_gradient, size, start, end, engine=job["bg_engine"], quality=job["quality"]))
+            text = self.node(
+                ("text", size, job["title"], job["subtitle"], job["margin"], title_fonts, subtitle_fonts, job["subtitle_gap"], shift_ratio, job["text_shadow"]),
+                partial(layout_text, size, job["title"], job["subtitle"], job["margin"], list(title_fonts), list(subtitle_fonts), job["subtitle_gap"], shift_ratio, job["text_shadow"]),
+            )
+            logo_key = None
+            if logo is not None:
+                width = logo_width(size, job["logo_scale"])
+                if not job["allow_upscale_logo"]:
+                    width = min(width, logo.width)
+                logo_key = self.node(("logo", logo.path, width), partial(logo.variant, width))
+
+            for theme in themes:
+                themed = background
+                if theme == "dark":
+                    themed = self.node(("dark", background), darken_background, background)
+                if "{theme}" in outdir_template:
+                    outdir = Path(_batch_template(outdir_template, dict(job, theme=theme)))
+                else:
+                    outdir = theme_path(Path(_batch_template(outdir_template, job)), theme, themes)
+                png = str(outdir / f"{name}.png")
+                jpg = str(outdir / f"{name}.jpg") if job["jpg"] else None
+                self.outputs.append(BatchOutput(png, jpg, themed, text, logo_key, job["margin"], exif_bytes))
+
+    def ordered(self) -> list[BatchOutput]:
+        """Outputs grouped by background, so each background can be freed after its last use."""
+
+        def light(out: BatchOutput) -> tuple:
+            return out.background[1] if out.background[0] == "dark" else out.background
+
+        first_seen: dict[tuple, int] = {}
+        for out in self.outputs:
+            first_seen.setdefault(light(out), len(first_seen))
+        return sorted(self.outputs, key=lambda out: (first_seen[light(out)], out.background[0] == "dark"))
+
+    def subset(self, outputs: list[BatchOutput]) -> "BatchPlan":
+        """A plan with only ``outputs`` and the intermediates they need."""
+        plan = BatchPlan()
+        plan.outputs = list(outputs)
+        stack = [dep for out in outputs for dep in out.deps()]
+        while stack:
+            key = stack.pop()
+            if key not in plan.nodes:
+                plan.nodes[key] = self.nodes[key]
+                stack.extend(self.nodes[key][1])
+        return plan
+
+
+def plan_batch(jobs: list[dict]) -> BatchPlan:
+    """Build the BatchPlan for expanded jobs (see expand_batch); raises ValueError on bad jobs."""
+    plan = BatchPlan()
+    for job in jobs:
+        plan.add_job(job)
+    seen = set()
+    for out in plan.outputs:
+        if out.png in seen:
+            raise ValueError(f"Two batch outputs write {out.png}; add a {{field}} to \"outdir\" or \"name\" that tells them apart")
+        seen.add(out.png)
+    return plan
+
+
+def run_batch(plan: BatchPlan, encoding: str | EncodingProfile = "default", should_stop: Optional[Callable[[], bool]] = None) -> list[str]:
+    """Compose and write every output of ``plan``; returns the written paths.
+
+    Intermediates are computed on first use and dropped as soon as their last
+    consumer (output or derived intermediate) is done, so memory stays bounded by
+    the backgrounds in use rather than by the size of the matrix. Encoding runs on
+    a background writer while the next output is composed. ``should_stop`` is
+    checked before each output; when it returns True the remaining outputs are
+    skipped (those already submitted are still written).
+    """
+    refs: dict[tuple, int] = {}
+    for _, deps in plan.nodes.values():
+        for dep in deps:
+            refs[dep] = refs.get(dep, 0) + 1
+    for out in plan.outputs:
+        for dep in out.deps():
+            refs[dep] = refs.get(dep, 0) + 1
+
+    values: dict[tuple, object] = {}
+
+    def acquire(key: tuple):
+        if key not in values:
+            compute, deps = plan.nodes[key]
+            with _stage(f"batch.{key[0]}"):
+                values[key] = compute(*(acquire(dep) for dep in deps))
+            for dep in deps:
+                release(dep)
+        return values[key]
+
+    def release(key: tuple) -> None:
+        refs[key] -= 1
+        if refs[key] == 0:
+            values.pop(key, None)
+
+    made = []
+    outdirs = {os.path.dirname(out.png) for out in plan.outputs}
+    for d in outdirs:
+        os.makedirs(d or ".", exist_ok=True)
+    composed = 0
+    with BackgroundWriter(encoding) as writer:
+        for out in plan.ordered():
+            if should_stop is not None and should_stop():
+                break
+            composed += 1
+            with _stage("theme.canvas"):
+                canvas = acquire(out.background).convert("RGBA")
+            draw_text_layout(canvas, acquire(out.text))
+            if out.logo:
+                composite_logo(canvas, *acquire(out.logo), out.margin)
+            for dep in out.deps():
+                release(dep)
+            writer.submit(canvas, out.png, out.jpg, out.exif_bytes, tag=out)
+            for done, _ in writer.completed():
+                made += _report_batch_output(done)
+        for done, _ in writer.completed(block=True):
+            made += _report_batch_output(done)
+    if composed < len(plan.outputs):
+        print(f"Batch: stopped after {composed} of {len(plan.outputs)} outputs")
+        return made
+    counts = plan.counts()
+    print(
+        f"Batch: {len(plan.outputs)} outputs from {counts.get('background', 0)} backgrounds "
+        f"({counts.get('dark', 0)} dark), {counts.get('text', 0)} text layouts and {counts.get('logo', 0)} logo layers"
+    )
+    return made
+
+
+def _report_batch_output(out: BatchOutput) -> list[str]:
+    if out.jpg:
+        print(f"Saved batch output: {out.png} and {out.jpg}")
+        return [out.png, out.jpg]
+    print(f"Saved batch output: {out.png}")
+    return [out.png]
+
+
+# Watch mode: quick proxies first, then the changed outputs at full size
+WATCH_INTERVAL = 0.5  # seconds between checks of the watched files
+PROXY_MAX_SIDE = 640  # longest side of a preview proxy
+PROXY_DIR = "_proxy"
+
+
+def proxy_path(png: str) -> str:
+    """Where the preview proxy of ``png`` goes: a _proxy folder next to it."""
+    p = Path(png)
+    return str(p.parent / PROXY_DIR / p.name)
+
+
+def render_proxy(plan: BatchPlan, out: BatchOutput, max_side: int = PROXY_MAX_SIDE) -> Image.Image:
+    """Low-resolution preview of a batch output with the layout of the full-size render.
+
+    The text layout and logo width are computed for the full size and then scaled,
+    so the font-size caps and margins look as they will in the final file; only the
+    background is rendered directly at the proxy size, with the draft tier.
+    """
+    dark = out.background[0] == "dark"
+    _, size, start, end, engine, _ = out.background[1] if dark else out.background
+    scale = min(1.0, max_side / max(size))
+    proxy_size = (max(1, round(size[0] * scale)), max(1, round(size[1] * scale)))
+    with _stage("proxy.background"):
+        bg = make_linear_gradient(proxy_size, start, end, engine=engine, quality="draft")
+        canvas = (darken_background(bg) if dark else bg).convert("RGBA")
+    layout_fn, _ = plan.nodes[out.text]
+    draw_text_layout(canvas, scale_text_layout(layout_fn(), scale), shadow_scale=scale)
+    if out.logo:
+        _, logo_path, width = out.logo
+        logo, shadow = get_logo_asset(logo_path).variant(max(1, round(width * scale)))
+        composite_logo(canvas, logo, shadow, round(out.margin * scale))
+    return canvas
+
+
+def batch_output_key(out: BatchOutput) -> str:
+    """Render key of a batch output: its intermediate keys plus the logo and font file contents."""
+    registry = get_font_registry()
+    title_fonts, subtitle_fonts = out.text[5], out.text[6]
+    inputs = {
+        "deps": out.deps(),
+        "margin": out.margin,
+        "exif": out.exif_bytes.hex() if out.exif_bytes else None,
+        "jpg": bool(out.jpg),
+        "logo": _file_digest(out.logo[1]) if out.logo else None,
+        "fonts": [_file_digest(registry.resolve(list(prefs))) for prefs in (title_fonts, subtitle_fonts)],
+        "script": _source_digest(),
+    }
+    blob = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class BatchManifests:
+    """The build manifests of the outdirs a batch writes to, for incremental runs.
+
+    Each output is recorded under its file stem with its render key (see
+    batch_output_key), in the ``.banner_manifest.json`` of its folder.
+    """
+
+    def __init__(self):
+        self._manifests: dict[Path, BuildManifest] = {}
+        self.keys: dict[str, str] = {}
+
+    def _entry(self, out: BatchOutput) -> Tuple[BuildManifest, str, list[str]]:
+        outdir = Path(out.png).parent
+        if outdir not in self._manifests:
+            self._manifests[outdir] = BuildManifest(outdir)
+        return self._manifests[outdir], Path(out.png).stem, [Path(p).name for p in (out.png, out.jpg) if p]
+
+    def stale(self, plan: BatchPlan) -> list[BatchOutput]:
+        """Outputs of ``plan`` whose render key or files differ from the manifest."""
+        self.keys = {out.png: batch_output_key(out) for out in plan.outputs}
+        stale = []
+        for out in plan.outputs:
+            manifest, name, files = self._entry(out)
+            if not manifest.is_fresh(name, self.keys[out.png], files):
+                stale.append(out)
+        return stale
+
+    def record(self, outputs: list[BatchOutput], written: set[str]) -> None:
+        """Record the outputs whose PNG is in ``written`` and save the changed manifests."""
+        for out in outputs:
+            if out.png in written:
+                manifest, name, files = self._entry(out)
+                manifest.record(name, self.keys[out.png], files)
+        for manifest in self._manifests.values():
+            if manifest.changed:
+                manifest.save()
+                manifest.changed = False
+
+
+def run_batch_incremental(plan: BatchPlan, encoding: str | EncodingProfile = "default") -> list[str]:
+    """run_batch for only the outputs whose inputs changed since the last recorded build."""
+    manifests = BatchManifests()
+    stale = manifests.stale(plan)
+    skipped = len(plan.outputs) - len(stale)
+    if not stale:
+        print(f"Batch: all {len(plan.outputs)} outputs up to date")
+        return []
+    made = run_batch(plan.subset(stale), encoding=encoding)
+    manifests.record(stale, set(made))
+    if skipped:
+        print(f"Batch: skipped {skipped} unchanged output(s)")
+    return made
+
+
+def _watched_files(jobs: list[dict], extra: list[Optional[str]]) -> list[str]:
+    # The config file plus every logo and resolved font file the jobs use
+    registry = get_font_registry()
+    paths = {os.path.abspath(p) for p in extra if p}
+    for job in jobs:
+        if job["logo"]:
+            paths.add(os.path.abspath(job["logo"]))
+        for key in ("title_font", "subtitle_font"):
+            font = registry.resolve(list(job[key]))
+            if font:
+                paths.add(os.path.abspath(font))
+    return sorted(paths)
+
+
+def _file_stamps(paths: list[str]) -> dict[str, Optional[Tuple[int, int]]]:
+    stamps = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamps[path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamps[path] = None
+    return stamps
+
+
+def watch_batch(load_jobs: Callable[[], list[dict]], config_path: Optional[str] = None, encoding: str | EncodingProfile = "default", proxy_max_side: int = PROXY_MAX_SIDE, interval: float = WATCH_INTERVAL) -> None:
+    """Re-render the jobs from ``load_jobs()`` whenever the config file, a logo or a font changes.
+
+    Each round first writes a low-resolution proxy (see render_proxy) of every output
+    whose render key changed, then renders those outputs at full size. The full-size
+    pass checks the watched files between outputs and gives way to the next round as
+    soon as something changes. Render keys are kept in each outdir's build manifest,
+    so a restarted watch only renders what changed meanwhile. Runs until interrupted.
+    """
+    manifests = BatchManifests()
+    jobs: list[dict] = []  # of the last round that planned
+
+    try:
+        while True:
+            loaded = None
+            try:
+                loaded = load_jobs()
+                plan = plan_batch(loaded)
+                jobs = loaded
+            except (OSError, ValueError) as e:
+                print(f"Watch: {e}")
+                plan = None
+            # After an error keep watching the last good round's files as well, so
+            # fixing a half-written logo or font starts the next round
+            watched = _watched_files((jobs + (loaded or [])) if plan is None else jobs, [config_path])
+            stamps = _file_stamps(watched)
+
+            def changed() -> bool:
+                return _file_stamps(watched) != stamps
+
+            if plan is not None:
+                try:
+                    stale = manifests.stale(plan)
+                    if stale:
+                        t0 = time.perf_counter()
+                        for out in stale:
+                            path = proxy_path(out.png)
+                            os.makedirs(os.path.dirname(path), exist_ok=True)
+                            render_proxy(plan, out, proxy_max_side).save(path, compress_level=1)
+                        print(f"Proxies: {len(stale)} in {time.perf_counter() - t0:.2f}s ({PROXY_DIR}/ next to each output)")
+                        manifests.record(stale, set(run_batch(plan.subset(stale), encoding=encoding, should_stop=changed)))
+                    else:
+                        print("Watch: all outputs up to date")
+                except (OSError, ValueError) as e:
+                    # e.g. a logo that is being saved: wait for the next change
+                    print(f"Watch: {e}")
+            print(f"Watching {len(watched)} file(s) for changes (Ctrl+C to stop)")
+            while not changed():
+                time.sleep(interval)
+            time.sleep(interval)  # let editors finish writing
+            now = _file_stamps(watched)
+            touched = [path for path in watched if now[path] != stamps[path]]
+            fonts = [path for path in touched if os.path.splitext(path)[1].lower() in FONT_EXTENSIONS]
+            for path in fonts:
+                get_font_registry().forget(path)
+            if fonts:
+                _TEXT_LAYERS.clear()
+            print(f"Changed: {', '.join(os.path.basename(p) for p in touched)}")
+    except KeyboardInterrupt:
+        print("Watch stopped")
@@ -0,0 +1,252 @@
+"""
+Logo palettes for make_banner.py
+
+Median-cut colors of a logo, the most distant usable pair in CIE Lab (batched with
+numpy when available) and the palette cache keyed by logo content. Imported on
+first use by LogoAsset.palette() and by --palettes.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from make_banner import _PERSIST_CACHES, _file_digest, _stage, cache_dir, np
+
+
+PALETTE_SIZE = 8  # median-cut colors per logo
+PALETTE_THUMB = 256  # logos are reduced to fit this box before quantizing
+PALETTE_FALLBACK_COLORS = [(34, 110, 255), (136, 58, 255)]
+GRAYISH_SPREAD = 12  # max(r, g, b) - min(r, g, b) below this counts as gray
+LOGO_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".tif", ".tiff")
+
+
+def logo_palette_colors(img: Image.Image) -> list[Tuple[int, int, int]]:
+    """The median-cut colors (at most PALETTE_SIZE) of a logo flattened onto white."""
+    # Remove transparent pixels and dark borders by compositing over white, then reduce
+    img = img.convert("RGBA")
+    flat = Image.alpha_composite(Image.new("RGBA", img.size, (255, 255, 255, 255)), img).convert("RGB")
+    flat.thumbnail((PALETTE_THUMB, PALETTE_THUMB), Image.LANCZOS)
+    quant = flat.quantize(colors=PALETTE_SIZE, method=Image.Quantize.MEDIANCUT)
+    palette = quant.getpalette() or []
+    used = sorted(index for _, index in quant.getcolors(PALETTE_SIZE) or [])
+    return [tuple(palette[3 * i: 3 * i + 3]) for i in used]
+
+
+def _palette_colors_from_file(path: str) -> Optional[list[Tuple[int, int, int]]]:
+    # Process-pool worker for extract_palettes. Decoded at full size like LogoAsset.image:
+    # the result lands in the palette cache that banner renders read
+    try:
+        with Image.open(path) as im:
+            return logo_palette_colors(im)
+    except Exception:
+        return None
+
+
+_SRGB_TO_XYZ = ((0.4124564, 0.3575761, 0.1804375), (0.2126729, 0.7151522, 0.0721750), (0.0193339, 0.1191920, 0.9503041))
+_D65_WHITE = (0.95047, 1.0, 1.08883)
+_LAB_EPSILON = (6 / 29) ** 3
+_LAB_SLOPE = 3 * (6 / 29) ** 2
+
+
+def _srgb_to_lab(c: Tuple[int, int, int]) -> Tuple[float, float, float]:
+    """CIE L*a*b* (D65) of an sRGB color."""
+    lin = [v / 255 / 12.92 if v <= 10 else ((v / 255 + 0.055) / 1.055) ** 2.4 for v in c]
+    xyz = [sum(m * v for m, v in zip(row, lin)) / white for row, white in zip(_SRGB_TO_XYZ, _D65_WHITE)]
+    fx, fy, fz = (t ** (1 / 3) if t > _LAB_EPSILON else t / _LAB_SLOPE + 4 / 29 for t in xyz)
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def _srgb_to_lab_array(rgb: "np.ndarray") -> "np.ndarray":
+    """Vectorized _srgb_to_lab over the last axis of a uint8 array."""
+    c = rgb.astype(np.float64) / 255
+    lin = np.where(c <= 10 / 255, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    xyz = lin @ np.array(_SRGB_TO_XYZ).T / np.array(_D65_WHITE)
+    f = np.where(xyz > _LAB_EPSILON, np.cbrt(xyz), xyz / _LAB_SLOPE + 4 / 29)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def _usable_palette_color(c: Tuple[int, int, int]) -> bool:
+    # Not gray, not almost black or almost white
+    return max(c) - min(c) >= GRAYISH_SPREAD and 80 <= sum(c) <= 720
+
+
+def _order_pair(c1: Tuple[int, int, int], c2: Tuple[int, int, int]) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]]:
+    # Prefer cooler color as start (left) and warmer as end (right)
+    return (c1, c2) if c1[0] - c1[2] < c2[0] - c2[2] else (c2, c1)
+
+
+def pick_gradient_pairs(palettes: list[Optional[list[Tuple[int, int, int]]]]) -> list[Tuple[Tuple[int, int, int], Tuple[int, int, int]] | None]:
+    """Gradient (start, end) for each logo palette: its two most distant usable colors in Lab.
+
+    Near-gray, near-black and near-white colors are skipped unless nothing else is
+    left. With numpy the whole batch is filtered and compared in one pass over a
+    padded (logos, PALETTE_SIZE, 3) array; ties go to the first pair in palette order.
+    """
+    candidates = []
+    for colors in palettes:
+        if colors is None:
+            candidates.append(None)
+            continue
+        usable = [c for c in colors if _usable_palette_color(c)]
+        candidates.append(usable or colors or PALETTE_FALLBACK_COLORS)
+    if np is None:
+        pairs = []
+        for colors in candidates:
+            best_pair, best_d = None, -1.0
+            labs = [_srgb_to_lab(c) for c in colors or []]
+            for i in range(len(labs)):
+                for j in range(i + 1, len(labs)):
+                    d = math.dist(labs[i], labs[j])
+                    if d > best_d:
+                        best_pair, best_d = (colors[i], colors[j]), d
+            pairs.append(_order_pair(*best_pair) if best_pair else None)
+        return pairs
+
+    n, k = len(candidates), max([len(c) for c in candidates if c] or [1])
+    rgb = np.zeros((n, k, 3), dtype=np.uint8)
+    valid = np.zeros((n, k), dtype=bool)
+    for row, colors in enumerate(candidates):
+        if colors:
+            rgb[row, :len(colors)] = colors
+            valid[row, :len(colors)] = True
+    lab = _srgb_to_lab_array(rgb)
+    dist = np.linalg.norm(lab[:, :, None, :] - lab[:, None, :, :], axis=-1)
+    # Only pairs i < j of real colors compete
+    allowed = valid[:, :, None] & valid[:, None, :] & np.triu(np.ones((k, k), dtype=bool), 1)
+    dist = np.where(allowed, dist, -1.0).reshape(n, k * k)
+    best = dist.argmax(axis=1)
+    pairs = []
+    for row, flat in enumerate(best):
+        if dist[row, flat] < 0:
+            pairs.append(None)
+            continue
+        i, j = divmod(int(flat), k)
+        pairs.append(_order_pair(tuple(int(v) for v in rgb[row, i]), tuple(int(v) for v in rgb[row, j])))
+    return pairs
+
+
+def _palette_pair_from_image(img: Image.Image) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]] | None:
+    return pick_gradient_pairs([logo_palette_colors(img)])[0]
+
+
+class PaletteCache:
+    """Logo gradient pairs keyed by the sha256 of the logo file, persisted as JSON.
+
+    Stored as ``palette_cache.json`` in ``cache_dir()``. Entries are only valid for
+    the extraction algorithm they were computed with, so the file carries VERSION.
+    Saving merges with what other processes wrote in the meantime.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path if path is not None else cache_dir() / "palette_cache.json"
+        self._entries: Optional[dict[str, Optional[list]]] = None
+        self._dirty: dict[str, Optional[list]] = {}
+
+    def _read(self) -> dict[str, Optional[list]]:
+        if not _PERSIST_CACHES.get():
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return data.get("palettes", {}) if data.get("version") == self.VERSION else {}
+
+    @property
+    def entries(self) -> dict[str, Optional[list]]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self.entries
+
+    def get(self, digest: str) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]] | None:
+        pair = self.entries.get(digest)
+        return (tuple(pair[0]), tuple(pair[1])) if pair else None
+
+    def put(self, digest: str, pair: Tuple[Tuple[int, int, int], Tuple[int, int, int]] | None) -> None:
+        value = [list(pair[0]), list(pair[1])] if pair else None
+        self.entries[digest] = value
+        self._dirty[digest] = value
+
+    def save(self) -> None:
+        if not self._dirty or not _PERSIST_CACHES.get():
+            return
+        entries = dict(self._read(), **self._dirty)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".palette_cache.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump({"version": self.VERSION, "palettes": entries}, fh, sort_keys=True)
+            os.replace(tmp, self.path)
+        except OSError:
+            return  # read-only cache dir: keep the in-memory entries only
+        self._entries = entries
+        self._dirty = {}
+
+    def clear(self) -> None:
+        """Forget every entry, on disk too."""
+        self._entries, self._dirty = {}, {}
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+_PALETTE_CACHE: Optional[PaletteCache] = None
+
+
+def get_palette_cache() -> PaletteCache:
+    global _PALETTE_CACHE
+    if _PALETTE_CACHE is None:
+        _PALETTE_CACHE = PaletteCache()
+    return _PALETTE_CACHE
+
+
+def extract_palettes(paths: list[str], jobs: Optional[int] = None) -> dict[str, Tuple[Tuple[int, int, int], Tuple[int, int, int]] | None]:
+    """Gradient pair for each logo file (None when unreadable), for onboarding many logos at once.
+
+    Results come from the palette cache when the file content was seen before.
+    Logos are decoded and quantized in ``jobs`` worker processes (default: CPU
+    count), once per distinct content, and all pairs are picked in one batched pass.
+    """
+    cache = get_palette_cache()
+    digests = {path: _file_digest(path) for path in paths}
+    todo = sorted({digest: path for path, digest in digests.items() if digest and digest not in cache}.items())
+    if todo:
+        files = [path for _, path in todo]
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        jobs = max(1, min(jobs, len(files)))
+        with _stage("palette.decode"):
+            if jobs == 1:
+                colors = [_palette_colors_from_file(path) for path in files]
+            else:
+                from concurrent.futures import ProcessPoolExecutor
+
+                with ProcessPoolExecutor(max_workers=jobs) as pool:
+                    colors = list(pool.map(_palette_colors_from_file, files, chunksize=max(1, len(files) // (4 * jobs))))
+        with _stage("palette.pick"):
+            pairs = pick_gradient_pairs(colors)
+        for (digest, _), pair in zip(todo, pairs):
+            cache.put(digest, pair)
+        cache.save()
+    return {path: cache.get(digest) if digest else None for path, digest in digests.items()}
+
+
+def find_logo_files(directory: str | Path) -> list[str]:
+    """Image files under ``directory`` (recursively), in sorted order."""
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        found += [os.path.join(root, f) for f in sorted(files) if os.path.splitext(f)[1].lower() in LOGO_EXTENSIONS]
+    return found
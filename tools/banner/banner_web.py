@@ -0,0 +1,216 @@
+"""
+Responsive web set for make_banner.py (--preset web)
+
+One aspect ratio at several widths and formats, with content-hashed file names,
+a JSON manifest and a ready-to-paste <picture> snippet.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from pathlib import Path
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from make_banner import (
+    FORMAT_NAMES,
+    MIME_TYPES,
+    SIZE,
+    WEB_WIDTHS,
+    EncodingProfile,
+    PresetZipWriter,
+    _exif_bytes,
+    _stage,
+    encode_image,
+    iter_banner_canvases,
+    render_key,
+    resolve_encoding,
+)
+
+
+WEB_FORMATS = ("avif", "webp", "jpeg")  # <source> order: the browser picks the first it supports
+WEB_EXTENSIONS = {"avif": ".avif", "webp": ".webp", "jpeg": ".jpg"}
+WEB_FALLBACK_WIDTH = 1200  # width of the JPEG in <img src> for browsers without srcset
+WEB_HASH_LENGTH = 10
+
+
+def avif_available() -> bool:
+    """Whether Pillow can write AVIF (Pillow >= 11.3 or the pillow-avif-plugin package)."""
+    try:  # Optional: registers the AVIF plugin on Pillow < 11.3
+        import pillow_avif  # noqa: F401
+    except ImportError:  # pragma: no cover - AVIF is optional
+        pass
+    Image.init()
+    return "AVIF" in Image.SAVE
+
+
+def resolve_web_formats(formats: Optional[list[str]] = None) -> list[str]:
+    """Validated web formats; by default AVIF is included only when an encoder is installed."""
+    if formats is None:
+        return [fmt for fmt in WEB_FORMATS if fmt != "avif" or avif_available()]
+    for fmt in formats:
+        if fmt not in WEB_FORMATS:
+            raise ValueError(f"Unknown web format: {fmt!r} (expected one of {', '.join(WEB_FORMATS)})")
+    if "avif" in formats and not avif_available():
+        raise RuntimeError("AVIF output requires Pillow >= 11.3 or pillow-avif-plugin (pip install pillow-avif-plugin)")
+    return [fmt for fmt in WEB_FORMATS if fmt in formats]
+
+
+def web_sizes(aspect: Tuple[int, int], widths: list[int]) -> list[Tuple[int, int]]:
+    """``(w, h)`` for each distinct width, smallest first, keeping the ``aspect`` ratio."""
+    if not widths or min(widths) < 1:
+        raise ValueError(f"Web widths must be positive (got {widths})")
+    aw, ah = aspect
+    return [(w, max(1, round(w * ah / aw))) for w in sorted(set(widths))]
+
+
+def picture_snippet(manifest: dict, base_url: str = "", alt: str = "") -> str:
+    """Ready-to-paste ``<picture>`` element for a web manifest (see render_web_set)."""
+    import html
+
+    sizes = html.escape(manifest["sizes"], quote=True)
+    by_format: dict[str, list[dict]] = {}
+    for image in manifest["images"]:
+        by_format.setdefault(image["format"], []).append(image)
+
+    def srcset(images: list[dict]) -> str:
+        return ", ".join(f"{html.escape(base_url + image['file'], quote=True)} {image['width']}w" for image in images)
+
+    lines = ["<picture>"]
+    for fmt, images in by_format.items():
+        if fmt != "jpeg":
+            lines.append(f'  <source type="{images[0]["type"]}" srcset="{srcset(images)}" sizes="{sizes}">')
+    fallback = manifest["fallback"]
+    lines.append(
+        f'  <img src="{html.escape(base_url + fallback["file"], quote=True)}" srcset="{srcset(by_format.get("jpeg", []))}" sizes="{sizes}" '
+        f'width="{fallback["width"]}" height="{fallback["height"]}" alt="{html.escape(alt, quote=True)}" decoding="async">'
+    )
+    lines.append("</picture>")
+    return "\n".join(lines) + "\n"
+
+
+def _web_image(rgb: Image.Image, size: Tuple[int, int], fmt: str, outdir: Path, name: str, profile: EncodingProfile, exif_bytes: Optional[bytes]) -> dict:
+    # Encode one variant and write it under its content-hashed name (unchanged bytes -> same file)
+    pil_fmt = FORMAT_NAMES.get(fmt, fmt.upper())
+    with _stage(f"web.encode.{fmt}"):
+        data = encode_image(rgb, pil_fmt, profile, exif_bytes=exif_bytes)
+    digest = hashlib.sha256(data).hexdigest()[:WEB_HASH_LENGTH]
+    file_name = f"{name}-{size[0]}.{digest}{WEB_EXTENSIONS[fmt]}"
+    path = outdir / file_name
+    if not path.is_file() or path.stat().st_size != len(data):
+        tmp_path = path.with_name(path.name + ".part")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    return {"format": fmt, "type": MIME_TYPES[pil_fmt], "width": size[0], "height": size[1], "file": file_name, "bytes": len(data)}
+
+
+def render_web_set(
+    outdirs: dict[str, Path],
+    name: str,
+    banner_kwargs: dict,
+    aspect: Tuple[int, int] = SIZE,
+    widths: Optional[list[int]] = None,
+    formats: Optional[list[str]] = None,
+    text_shift: float = 0.0,
+    sizes: str = "100vw",
+    base_url: str = "",
+    jobs: Optional[int] = None,
+    incremental: bool = False,
+    zip_archives: Optional[dict[str, str]] = None,
+) -> dict[str, dict]:
+    """Render a responsive image set per theme into ``outdirs[theme]``; returns the manifests.
+
+    Every width shows the same layout (as srcset expects), so the banner is drawn once
+    per theme at the largest width and each smaller width is a LANCZOS downscale of
+    that canvas. The variants are encoded as AVIF/WebP/progressive JPEG on a thread
+    pool and saved as ``<name>-<width>.<hash>.<ext>``; ``<name>.web.json`` lists them
+    and ``<name>.picture.html`` holds the ``<picture>`` markup. Files from a previous
+    run that the new manifest no longer references are removed. With ``incremental``,
+    themes whose inputs are unchanged are skipped. ``zip_archives`` maps themes to a
+    zip of their set (variants, manifest and snippet), rebuilt when the theme was
+    rendered or the archive is missing.
+    """
+    sizes_wh = web_sizes(aspect, list(widths or WEB_WIDTHS))
+    formats = resolve_web_formats(formats)
+    profile = resolve_encoding(banner_kwargs.get("encoding", "default"))
+    # Web JPEGs are always progressive with optimized Huffman tables
+    profile = profile._replace(jpeg_optimize=True, jpeg_progressive=True)
+    exif_bytes = _exif_bytes(banner_kwargs.get("exif_artist"), banner_kwargs.get("exif_copyright"), banner_kwargs.get("exif_description"))
+    common = {k: v for k, v in banner_kwargs.items() if k not in ("output", "jpg_output", "dark_theme", "encoding", "max_memory") and not k.startswith("exif_")}
+    master = sizes_wh[-1]
+    key_inputs = dict(banner_kwargs, size=master, text_shift_ratio=text_shift, web=[sizes_wh, formats, sizes, base_url], encoding=profile)
+
+    manifests: dict[str, dict] = {}
+    previous: dict[str, dict] = {}
+    themes = []
+    for theme, outdir in outdirs.items():
+        outdir.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(outdir / f"{name}.web.json", "r", encoding="utf-8") as fh:
+                previous[theme] = json.load(fh)
+        except (OSError, ValueError):
+            previous[theme] = {}
+        key = render_key(dict(key_inputs, dark_theme=theme == "dark"))
+        old = previous[theme]
+        if incremental and old.get("key") == key and all((outdir / image["file"]).is_file() for image in old.get("images", [])):
+            print(f"Up to date: {outdir / (name + '.web.json')}")
+            manifests[theme] = old
+            continue
+        manifests[theme] = {"version": 1, "name": name, "key": key, "aspect": list(aspect), "sizes": sizes}
+        themes.append(theme)
+    if not themes:
+        _zip_web_sets(zip_archives, outdirs, name, manifests, themes)
+        return manifests
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix="banner-web") as executor, _stage("build_banner"):
+        canvases = iter_banner_canvases(themes, size=master, text_shift_ratio=text_shift, **common)
+        for theme, canvas in canvases:
+            outdir = outdirs[theme]
+            with _stage("web.resize"):
+                rgb = canvas.convert("RGB")
+                del canvas
+                variants = [(size, rgb if size == master else rgb.resize(size, Image.LANCZOS, reducing_gap=3.0)) for size in sizes_wh]
+            # Pillow's encoders release the GIL, so the variants encode in parallel
+            futures = [
+                executor.submit(copy_context().run, _web_image, image, size, fmt, outdir, name, profile, exif_bytes)
+                for fmt in formats
+                for size, image in variants
+            ]
+            images = [fut.result() for fut in futures]
+            del variants, rgb
+
+            manifest = manifests[theme]
+            manifest["images"] = images
+            jpegs = [image for image in images if image["format"] == "jpeg"] or images
+            manifest["fallback"] = min(jpegs, key=lambda image: (abs(image["width"] - WEB_FALLBACK_WIDTH), image["width"]))
+            with open(outdir / f"{name}.web.json", "w", encoding="utf-8") as fh:
+                json.dump(manifest, fh, indent=2)
+                fh.write("\n")
+            (outdir / f"{name}.picture.html").write_text(picture_snippet(manifest, base_url, alt=common.get("title", "")), encoding="utf-8")
+
+            keep = {image["file"] for image in images}
+            for old in previous[theme].get("images", []):
+                if old["file"] not in keep and (outdir / old["file"]).is_file():
+                    (outdir / old["file"]).unlink()
+            total = {fmt: sum(image["bytes"] for image in images if image["format"] == fmt) for fmt in formats}
+            print(f"Saved web set: {outdir / (name + '.web.json')} ({len(images)} files; " + ", ".join(f"{fmt} {total[fmt] / 1024:.0f} KB" for fmt in formats) + ")")
+    _zip_web_sets(zip_archives, outdirs, name, manifests, themes)
+    return manifests
+
+
+def _zip_web_sets(zip_archives: Optional[dict[str, str]], outdirs: dict[str, Path], name: str, manifests: dict[str, dict], rendered: list[str]) -> None:
+    for theme, archive in (zip_archives or {}).items():
+        if theme not in rendered and os.path.isfile(archive):
+            continue
+        outdir = outdirs[theme]
+        order = [image["file"] for image in manifests[theme]["images"]] + [f"{name}.web.json", f"{name}.picture.html"]
+        zw = PresetZipWriter(archive, order)
+        for arcname in order:
+            zw.add(arcname, path=str(outdir / arcname))
+        print(f"Zipped web set to {zw.close()}")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the Conecta Libras banner generator (make_banner.py)
+
+Times the main stages at representative sizes, from the 1200x630 OG image up to
+the 4800x2520 master, using the bundled WSS Studio Art logo as the fixture:
+- make_linear_gradient (background)
+- derive_gradient_from_logo (logo decode + palette, uncached)
+- fit_text (title fitting, fonts reloaded)
+- place_logo (resize + shadow + composite, variants uncached)
+- build_banner (full PNG+JPG render into a temp dir)
+- startup (fresh interpreter: import, --help, and short OG renders with warm caches)
+
+Each benchmark reports the best of --repeat runs. Results are compared against a
+baseline file and the run fails (exit code 1) when a benchmark is slower than
+baseline x budget. Runs offline; the baseline is machine-specific, so refresh it
+with --update-baseline on the machine that enforces the budgets.
+
+Usage examples:
+  python tools/banner/bench_banner.py
+  python tools/banner/bench_banner.py --update-baseline
+  python tools/banner/bench_banner.py --budget 1.5 --budget-for "build_banner[Master_4800x2520]=2.0"
+  python tools/banner/bench_banner.py --only gradient --no-fail --json bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+import banner_palette  # noqa: E402
+import make_banner as mb  # noqa: E402
+
+
+REPO_ROOT = HERE.parent.parent
+LOGO_FIXTURE = REPO_ROOT / "assets" / "logo" / "wss_studio_art_logo.png"
+SCRIPT = HERE / "make_banner.py"
+DEFAULT_BASELINE = HERE / "bench_baseline.json"
+DEFAULT_BUDGET = 1.5  # fail when slower than baseline x 1.5
+MIN_REGRESSION_S = 0.005  # ignore slowdowns below 5 ms (timer noise)
+
+BENCH_SIZES = [
+    ("OG_1200x630", 1200, 630),
+    ("IG_1080x1920", 1080, 1920),
+    ("YouTubeBanner_2560x1440", 2560, 1440),
+    ("Master_4800x2520", 4800, 2520),
+]
+TITLE = "Conecta Libras"
+SUBTITLE = "Comunicação inclusiva sem barreiras"
+
+
+def _clear_logo_cache() -> None:
+    # Also drop the palettes, which are cached by logo content
+    mb._LOGO_ASSETS.clear()
+    banner_palette.get_palette_cache().clear()
+
+
+def _clear_logo_variants(logo: str) -> None:
+    # Keep the decoded logo, drop the resized/shadowed variants
+    mb.get_logo_asset(logo)._variants.clear()
+
+
+def _clear_font_cache() -> None:
+    # Keep the persisted name -> path index, drop the loaded FreeType faces
+    mb.get_font_registry()._fonts.clear()
+
+
+def build_benchmarks(logo: str, workdir: str) -> list[Tuple[str, Callable[[], None], Optional[Callable[[], None]]]]:
+    """(name, run, setup) triples; setup runs untimed before every repetition."""
+    # Keep the benchmark's persistent caches away from the user's; the startup
+    # subprocesses inherit the same directory
+    os.environ["BANNER_CACHE_DIR"] = os.path.join(workdir, "cache")
+    banner_palette._PALETTE_CACHE = None
+    benches = [("derive_gradient_from_logo", lambda: mb.derive_gradient_from_logo(logo), _clear_logo_cache)]
+    start, end = mb.derive_gradient_from_logo(logo) or (mb.BG_GRADIENT_START, mb.BG_GRADIENT_END)
+    for name, w, h in BENCH_SIZES:
+        size = (w, h)
+        benches.append((f"make_linear_gradient[{name}]", lambda size=size: mb.make_linear_gradient(size, start, end), None))
+
+        scratch = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        safe_w = w - 2 * mb.DEFAULT_MARGIN
+        benches.append((f"fit_text[{name}]", lambda safe_w=safe_w: mb.fit_text(scratch, TITLE, safe_w, [], max_size=112, min_size=32), _clear_font_cache))
+
+        canvas = Image.new("RGBA", size, (34, 110, 255, 255))
+        logo_w = max(16, int(int(w * 0.16) * 0.20))
+        benches.append((f"place_logo[{name}]", lambda canvas=canvas, logo_w=logo_w: mb.place_logo(canvas, logo, margin=mb.DEFAULT_MARGIN, scale_width=logo_w), lambda: _clear_logo_variants(logo)))
+
+        png = os.path.join(workdir, f"{name}.png")
+        jpg = os.path.join(workdir, f"{name}.jpg")
+        benches.append((
+            f"build_banner[{name}]",
+            lambda size=size, png=png, jpg=jpg: mb.build_banner(TITLE, SUBTITLE, logo_path=logo, output=png, jpg_output=jpg, size=size, logo_scale=0.20, subtitle_gap_factor=1.6),
+            _clear_logo_cache,
+        ))
+
+    og = os.path.join(workdir, "startup.png")
+    cli_runs = [
+        ("startup[import]", ["-c", "import make_banner"]),
+        ("startup[help]", [str(SCRIPT), "--help"]),
+        ("startup[og_png]", [str(SCRIPT), "--output", og, "--logo", logo, "--logo-scale", "0.2"]),
+        ("startup[og_jpg_exif]", [str(SCRIPT), "--output", og, "--jpg", og[:-4] + ".jpg", "--logo", logo, "--logo-scale", "0.2", "--exif-artist", "WSS Studio Art"]),
+    ]
+    for name, argv in cli_runs:
+        benches.append((name, lambda argv=argv: _run_cli(argv), None))
+    return benches
+
+
+def _run_cli(argv: list[str]) -> None:
+    # A fresh interpreter each time, as in a shell loop of short renders
+    subprocess.run([sys.executable] + argv, cwd=HERE, check=True, stdout=subprocess.DEVNULL)
+
+
+def time_bench(run: Callable[[], None], setup: Optional[Callable[[], None]], repeat: int, warmup: int = 1) -> float:
+    """Best wall time in seconds over ``repeat`` runs, after ``warmup`` untimed runs."""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        run()
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def load_baseline(path: Path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def machine_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "pillow": Image.__version__,
+        "numpy": getattr(mb.np, "__version__", None),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], budget: float, overrides: dict[str, float]) -> list[Tuple[str, float, Optional[float], Optional[float], bool]]:
+    """Rows of (name, seconds, baseline seconds, ratio, regressed)."""
+    rows = []
+    for name, seconds in results.items():
+        base = baseline.get(name)
+        if base is None:
+            rows.append((name, seconds, None, None, False))
+            continue
+        ratio = seconds / base if base > 0 else float("inf")
+        limit = overrides.get(name, budget)
+        regressed = ratio > limit and seconds - base > MIN_REGRESSION_S
+        rows.append((name, seconds, base, ratio, regressed))
+    return rows
+
+
+def format_rows(rows) -> str:
+    lines = [f"{'benchmark':<48} {'ms':>9} {'baseline':>9} {'ratio':>7}"]
+    for name, seconds, base, ratio, regressed in rows:
+        base_s = f"{1000 * base:>9.1f}" if base is not None else f"{'-':>9}"
+        ratio_s = f"{ratio:>7.2f}" if ratio is not None else f"{'new':>7}"
+        flag = "  REGRESSION" if regressed else ""
+        lines.append(f"{name:<48} {1000 * seconds:>9.1f} {base_s} {ratio_s}{flag}")
+    return "\n".join(lines)
+
+
+def parse_budget_override(value: str) -> Tuple[str, float]:
+    name, sep, ratio = value.rpartition("=")
+    if not sep or not name:
+        raise argparse.ArgumentTypeError("expected NAME=RATIO")
+    try:
+        return name, float(ratio)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid ratio {ratio!r}")
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark make_banner.py stages against a stored baseline")
+    p.add_argument("--logo", default=str(LOGO_FIXTURE), help="Logo fixture (default: bundled assets/logo image)")
+    p.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON file")
+    p.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline instead of comparing")
+    p.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark; the best is kept (default 5)")
+    p.add_argument("--budget", type=float, default=DEFAULT_BUDGET, help=f"Allowed slowdown ratio vs baseline (default {DEFAULT_BUDGET})")
+    p.add_argument("--budget-for", action="append", type=parse_budget_override, default=[], metavar="NAME=RATIO", help="Per-benchmark budget override; can be repeated")
+    p.add_argument("--only", default=None, help="Only run benchmarks whose name contains this substring")
+    p.add_argument("--json", dest="json_out", default=None, help="Also write the results and comparison to this JSON file")
+    p.add_argument("--no-fail", action="store_true", help="Report regressions without a failing exit code")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if not os.path.isfile(args.logo):
+        print(f"Logo fixture not found: {args.logo}", file=sys.stderr)
+        return 2
+
+    results: dict[str, float] = {}
+    with tempfile.TemporaryDirectory(prefix="banner_bench_") as workdir:
+        for name, run, setup in build_benchmarks(args.logo, workdir):
+            if args.only and args.only not in name:
+                continue
+            results[name] = time_bench(run, setup, repeat=max(1, args.repeat))
+            print(f"{name:<48} {1000 * results[name]:>9.1f} ms", flush=True)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        data = load_baseline(baseline_path)
+        merged = dict(data.get("results", {}), **results)
+        with open(baseline_path, "w", encoding="utf-8") as fh:
+            json.dump({"machine": machine_info(), "results": merged}, fh, indent=2, sort_keys=True)
+            fh.write("\n")
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+
+    baseline = load_baseline(baseline_path)
+    overrides = dict(args.budget_for)
+    rows = compare(results, baseline.get("results", {}), args.budget, overrides)
+    print()
+    print(format_rows(rows))
+    regressions = [row[0] for row in rows if row[4]]
+
+    if args.json_out:
+        Path(args.json_out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json_out, "w", encoding="utf-8") as fh:
+            json.dump({
+                "machine": machine_info(),
+                "baseline_machine": baseline.get("machine"),
+                "budget": args.budget,
+                "results": results,
+                "regressions": regressions,
+            }, fh, indent=2, sort_keys=True)
+
+    if not baseline:
+        print(f"No baseline at {baseline_path}; run with --update-baseline to create one")
+    else:
+        current = machine_info()
+        recorded = baseline.get("machine") or {}
+        drift = [f"{key} {recorded.get(key)} -> {current[key]}" for key in ("python", "pillow", "numpy") if recorded.get(key) != current[key]]
+        if drift:
+            print(f"Note: the baseline was recorded with different dependencies ({', '.join(drift)}); install requirements.txt for comparable budgets")
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) over budget: {', '.join(regressions)}")
+        return 0 if args.no_fail else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
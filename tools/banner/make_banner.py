@@ -13,19 +13,44 @@ Usage examples:
   python make_banner.py --output banner_conecta_libras.png --logo wss.png --title "Conecta Libras" --subtitle "Comunicação inclusiva sem barreiras"
 
 If no --logo is provided, the banner is created without a logo.
+
+As a library (no output files written): render_banner(BannerRequest(...)) returns
+the encoded PNG/JPEG/WebP bytes.
 """
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import math
+import mmap
 import os
-from typing import Optional, Tuple
+import io
+import tempfile
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures import wait as futures_wait
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar, copy_context
+from functools import partial
+from typing import Iterator, NamedTuple, Optional, Tuple
 
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
-import piexif
-import shutil
 from pathlib import Path
 
+# Imported where used, to keep short runs quick: piexif (EXIF fields only),
+# zipfile (--zip), html (web snippet), concurrent.futures.process (--jobs > 1),
+# and the sibling modules banner_palette (logo palettes), banner_animation (--animate),
+# banner_web (--preset web) and banner_batch (--batch, --watch)
+
+try:  # Optional: array-backed background engine
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
 
 SIZE = (1200, 630)  # Facebook/LinkedIn/Twitter OG size
 BG_GRADIENT_START = (34, 110, 255)  # default blue
@@ -33,6 +58,18 @@ BG_GRADIENT_END = (136, 58, 255)    # default purple
 TEXT_COLOR = (255, 255, 255)
 SHADOW_COLOR = (0, 0, 0, 90)
 DEFAULT_MARGIN = 36
+BG_ENGINES = ("auto", "numpy", "pil")
+VIGNETTE_STEP = 8  # ring spacing of the radial highlight (px)
+VIGNETTE_BLUR = 60  # Gaussian blur radius applied to the rings at the reference SIZE
+# Quality tiers for the low-frequency background: the smooth layers are rendered with
+# their diagonal capped at this multiple of the SIZE diagonal and then upsampled.
+# None renders at full output resolution.
+QUALITY_TIERS = {"draft": 0.5, "standard": 1.0, "max": None}
+DARK_OVERLAY_ALPHA = int(255 * 0.35)  # 35% black overlay for dark theme
+THEMES = ("light", "dark")
+TEXT_SHADOWS = ("hard", "soft")  # hard: offset black copy (original look); soft: blurred, translucent
+SOFT_SHADOW_ALPHA = 150
+SOFT_SHADOW_BLUR = 0.06  # blur radius as a fraction of the font size
 
 
 def lerp(a: float, b: float, t: float) -> float:
@@ -43,170 +80,889 @@ def lerp_color(c1: Tuple[int, int, int], c2: Tuple[int, int, int], t: float) ->
     return tuple(int(lerp(c1[i], c2[i], t)) for i in range(3))
 
 
-def make_linear_gradient(size: Tuple[int, int], start: Tuple[int, int, int], end: Tuple[int, int, int], dark: bool = False) -> Image.Image:
+class StageProfiler:
+    """Wall time and peak Pillow image memory (sampled from the block arena) per named stage."""
+
+    # Smaller arena blocks while profiling make the memory figures finer-grained
+    PROFILE_BLOCK_SIZE = 1 << 20
+
+    def __init__(self, sample_interval: float = 0.002):
+        self.sample_interval = sample_interval
+        self.stages: dict[str, dict] = {}
+        self._open: list[list[int]] = []
+        self._lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+
+    @staticmethod
+    def live_image_bytes() -> int:
+        stats = Image.core.get_stats()
+        blocks = stats["allocated_blocks"] - stats["freed_blocks"] - stats["blocks_cached"]
+        return max(0, blocks) * Image.core.get_block_size()
+
+    def _sample(self) -> None:
+        while True:
+            live = self.live_image_bytes()
+            with self._lock:
+                if not self._open:
+                    self._sampler = None
+                    return
+                for mark in self._open:
+                    mark[1] = max(mark[1], live)
+            time.sleep(self.sample_interval)
+
+    @contextmanager
+    def stage(self, name: str):
+        live = self.live_image_bytes()
+        mark = [live, live]
+        with self._lock:
+            self._open.append(mark)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name="banner-profiler", daemon=True)
+                self._sampler.start()
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            live = self.live_image_bytes()
+            with self._lock:
+                self._open = [m for m in self._open if m is not mark]
+                stat = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "peak_mb": 0.0})
+                stat["calls"] += 1
+                stat["seconds"] += elapsed
+                stat["max_seconds"] = max(stat["max_seconds"], elapsed)
+                stat["peak_mb"] = max(stat["peak_mb"], (max(mark[1], live) - mark[0]) / (1 << 20))
+
+    def report(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: dict(stat) for name, stat in self.stages.items()}
+
+
+_PROFILER: ContextVar[Optional[StageProfiler]] = ContextVar("banner_profiler", default=None)
+_PROFILING_LOCK = threading.Lock()
+
+
+@contextmanager
+def profiling(profiler: Optional[StageProfiler] = None):
+    """Record the stages of every banner rendered inside the block.
+
+    Pillow's block size is process-wide, so this is for the CLI and scripts only:
+    it must run on the main thread and cannot be nested (RuntimeError otherwise).
+    """
+    if threading.current_thread() is not threading.main_thread():
+        raise RuntimeError("profiling() changes Pillow's process-wide block size and must run on the main thread")
+    if not _PROFILING_LOCK.acquire(blocking=False):
+        raise RuntimeError("profiling() is already active")
+    profiler = profiler if profiler is not None else StageProfiler()
+    block_size = Image.core.get_block_size()
+    Image.core.set_block_size(StageProfiler.PROFILE_BLOCK_SIZE)
+    token = _PROFILER.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _PROFILER.reset(token)
+        Image.core.set_block_size(block_size)
+        _PROFILING_LOCK.release()
+
+
+def _stage(name: str):
+    profiler = _PROFILER.get()
+    return profiler.stage(name) if profiler is not None else nullcontext()
+
+
+def merge_profiles(reports: list[dict[str, dict]]) -> dict[str, dict]:
+    """Aggregate several ``StageProfiler.report()`` results."""
+    merged: dict[str, dict] = {}
+    for report in reports:
+        for name, stat in report.items():
+            agg = merged.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "peak_mb": 0.0})
+            agg["calls"] += stat["calls"]
+            agg["seconds"] += stat["seconds"]
+            agg["max_seconds"] = max(agg["max_seconds"], stat["max_seconds"])
+            agg["peak_mb"] = max(agg["peak_mb"], stat["peak_mb"])
+    return merged
+
+
+def format_profile_table(report: dict[str, dict]) -> str:
+    lines = [f"{'stage':<22} {'calls':>6} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'peak MB':>8}"]
+    for name, stat in sorted(report.items(), key=lambda kv: kv[1]["seconds"], reverse=True):
+        mean_ms = 1000 * stat["seconds"] / max(1, stat["calls"])
+        lines.append(f"{name:<22} {stat['calls']:>6} {stat['seconds']:>9.3f} {mean_ms:>9.1f} {1000 * stat['max_seconds']:>9.1f} {stat['peak_mb']:>8.1f}")
+    return "\n".join(lines)
+
+
+def write_profile(path: str | Path, report: dict[str, dict], **meta) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(dict(meta, stages=report), fh, indent=2, sort_keys=True)
+
+
+def _resolve_engine(engine: str) -> str:
+    if engine not in BG_ENGINES:
+        raise ValueError(f"Unknown background engine: {engine!r} (expected one of {', '.join(BG_ENGINES)})")
+    if engine == "auto":
+        return "numpy" if np is not None else "pil"
+    if engine == "numpy" and np is None:
+        raise RuntimeError("The numpy background engine requires numpy (pip install numpy)")
+    return engine
+
+
+def vignette_blur_radius(size: Tuple[int, int]) -> float:
+    """Blur radius for the radial highlight, scaled with the canvas diagonal (60 px at SIZE)."""
+    return VIGNETTE_BLUR * math.hypot(*size) / math.hypot(*SIZE)
+
+
+def internal_background_size(size: Tuple[int, int], quality: str = "standard") -> Tuple[int, int]:
+    """Resolution at which the background is rendered before upsampling to ``size``."""
+    if quality not in QUALITY_TIERS:
+        raise ValueError(f"Unknown quality tier: {quality!r} (expected one of {', '.join(QUALITY_TIERS)})")
+    cap = QUALITY_TIERS[quality]
     w, h = size
-    # Diagonal gradient left->right with slight vertical variation
-    base = Image.new("RGB", size, start)
-    grad = Image.new("RGB", (w, 1))
-    for x in range(w):
-        t = x / max(1, (w - 1))
-        grad.putpixel((x, 0), lerp_color(start, end, t))
-    grad = grad.resize((w, h))
-    # Add a subtle radial light to add depth
-    vignette = Image.new("L", (w, h), 0)
-    vd = ImageDraw.Draw(vignette)
-    cx, cy = int(w * 0.2), int(h * 0.3)
-    max_r = int(math.hypot(w, h) * 0.6)
-    for r in range(max_r, 0, -8):
-        alpha = int(255 * (1 - r / max_r) ** 2)
-        vd.ellipse((cx - r, cy - r, cx + r, cy + r), fill=alpha)
-    vignette = vignette.filter(ImageFilter.GaussianBlur(60))
-
-    grad = Image.composite(grad, base, Image.new("L", (w, h), 255))
-    highlight = Image.new("RGB", (w, h), (255, 255, 255))
-    grad = Image.composite(highlight, grad, vignette)
-    if dark:
-        # Darken overall and reduce highlight for dark theme
-        overlay = Image.new("RGB", (w, h), (0, 0, 0))
-        # 35% black overlay
-        mask = Image.new("L", (w, h), int(255 * 0.35))
-        grad = Image.composite(overlay, grad, mask)
+    if cap is None:
+        return size
+    scale = cap * math.hypot(*SIZE) / math.hypot(w, h)
+    if scale >= 1:
+        return size
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+def make_linear_gradient(size: Tuple[int, int], start: Tuple[int, int, int], end: Tuple[int, int, int], dark: bool = False, engine: str = "auto", quality: str = "standard") -> Image.Image:
+    """Render the banner background: linear ramp + blurred radial highlight (+ dark overlay).
+
+    ``engine`` selects the implementation: ``"pil"`` is the original drawing path,
+    ``"numpy"`` computes the same image with array operations and ``"auto"``
+    picks numpy when it is installed.
+
+    The background is low-frequency only, so ``quality`` (see QUALITY_TIERS) lets it
+    be rendered at a reduced internal resolution and upsampled; ``"max"`` renders
+    at full size.
+    """
+    grad = make_background_source(size, start, end, dark=dark, engine=engine, quality=quality)
+    if grad.size != tuple(size):
+        with _stage("gradient.upsample"):
+            grad = grad.resize(tuple(size), Image.BILINEAR)
     return grad
 
 
-def _color_distance(c1: Tuple[int, int, int], c2: Tuple[int, int, int]) -> float:
-    return math.sqrt(sum((a - b) ** 2 for a, b in zip(c1, c2)))
+def make_background_source(size: Tuple[int, int], start: Tuple[int, int, int], end: Tuple[int, int, int], dark: bool = False, engine: str = "auto", quality: str = "standard") -> Image.Image:
+    """The background at its internal resolution (see internal_background_size), before upsampling."""
+    inner = internal_background_size(size, quality)
+    blur_radius = vignette_blur_radius(inner)
+    if _resolve_engine(engine) == "numpy":
+        return _make_linear_gradient_numpy(inner, start, end, dark=dark, blur_radius=blur_radius)
+    return _make_linear_gradient_pil(inner, start, end, dark=dark, blur_radius=blur_radius)
+
 
+def upsample_rows(source: Image.Image, size: Tuple[int, int], y0: int, y1: int) -> Image.Image:
+    """Rows ``y0:y1`` of ``source`` upsampled to ``size``; identical to the same rows of the full resize."""
+    if source.size == tuple(size):
+        return source.crop((0, y0, size[0], y1))
+    sh = source.height / size[1]
+    return source.resize((size[0], y1 - y0), Image.BILINEAR, box=(0, y0 * sh, source.width, y1 * sh))
+
+
+def _make_linear_gradient_pil(size: Tuple[int, int], start: Tuple[int, int, int], end: Tuple[int, int, int], dark: bool = False, blur_radius: float = VIGNETTE_BLUR) -> Image.Image:
+    w, h = size
+    with _stage("gradient.ramp"):
+        # Diagonal gradient left->right with slight vertical variation
+        base = Image.new("RGB", size, start)
+        grad = Image.new("RGB", (w, 1))
+        for x in range(w):
+            t = x / max(1, (w - 1))
+            grad.putpixel((x, 0), lerp_color(start, end, t))
+        grad = grad.resize((w, h))
+    with _stage("gradient.vignette"):
+        # Add a subtle radial light to add depth
+        vignette = _vignette_rings_pil(w, h)
+    with _stage("gradient.blur"):
+        vignette = vignette.filter(ImageFilter.GaussianBlur(blur_radius))
+
+    with _stage("gradient.composite"):
+        grad = Image.composite(grad, base, Image.new("L", (w, h), 255))
+        highlight = Image.new("RGB", (w, h), (255, 255, 255))
+        grad = Image.composite(highlight, grad, vignette)
+        if dark:
+            # Darken overall and reduce highlight for dark theme
+            overlay = Image.new("RGB", (w, h), (0, 0, 0))
+            # 35% black overlay
+            mask = Image.new("L", (w, h), DARK_OVERLAY_ALPHA)
+            grad = Image.composite(overlay, grad, mask)
+    return grad
 
-def _is_grayish(c: Tuple[int, int, int], thresh: int = 12) -> bool:
-    r, g, b = c
-    return max(r, g, b) - min(r, g, b) < thresh
+
+def _div255(v):
+    # Same rounding as PIL's paste/composite blend, in place on an unsigned array
+    v += 128
+    v += v >> 8
+    v >>= 8
+    return v
+
+
+def _vignette_rings_pil(w: int, h: int, center: Optional[Tuple[int, int]] = None, max_r: Optional[int] = None) -> Image.Image:
+    """Concentric rings of the radial highlight, drawn as filled ellipses (before blurring)."""
+    vignette = Image.new("L", (w, h), 0)
+    vd = ImageDraw.Draw(vignette)
+    cx, cy = center if center is not None else (int(w * 0.2), int(h * 0.3))
+    if max_r is None:
+        max_r = int(math.hypot(w, h) * 0.6)
+    for r in range(max_r, 0, -VIGNETTE_STEP):
+        alpha = int(255 * (1 - r / max_r) ** 2)
+        vd.ellipse((cx - r, cy - r, cx + r, cy + r), fill=alpha)
+    return vignette
+
+
+def _vignette_rings(w: int, h: int, center: Optional[Tuple[int, int]] = None, max_r: Optional[int] = None) -> "np.ndarray":
+    """Concentric ring mask equivalent to the ellipses drawn by the PIL engine."""
+    cx, cy = center if center is not None else (int(w * 0.2), int(h * 0.3))
+    if max_r is None:
+        max_r = int(math.hypot(w, h) * 0.6)
+    # Ring k (k >= 0) has radius max_r - k * step; index 0 of the LUT is "outside every ring"
+    n_rings = max(0, (max_r - 1) // VIGNETTE_STEP)
+    radii = max_r - VIGNETTE_STEP * np.arange(n_rings + 1)
+    lut = np.zeros(n_rings + 2, dtype=np.uint8)
+    if max_r > 0:
+        lut[1:] = (255 * (1 - radii / max_r) ** 2).astype(np.uint8)
+
+    # Pillow fills pixel (dx, dy) of an ellipse of radius r iff q = dx^2 + dy^2 - max(|dx|, |dy|) < r^2,
+    # and q grows with |dx|, so each row is a run of each ring value: the innermost ring drawn last wins
+    cx, cy = int(cx), int(cy)
+    top = max(abs(cx), abs(w - 1 - cx)) + 1  # |dx| < top
+    ay = np.abs(np.arange(h, dtype=np.int64) - cy)[:, None]
+    r2 = (radii[::-1] ** 2)[None, :]
+
+    def q(ax):
+        return ay * ay + ax * ax - np.maximum(ax, ay)
+
+    # ends[y, j]: count of |dx| inside ring n_rings - j on row y; float estimate, then exact integer fix-up
+    rem = (r2 - ay * ay).astype(np.float64)
+    near = np.ceil(np.sqrt(np.maximum(rem + ay, 0)))
+    far = np.ceil((1 + np.sqrt(np.maximum(1 + 4 * rem, 0))) / 2)
+    ends = np.where(near <= ay, near, np.maximum(far, ay + 1)).astype(np.int64)
+    while True:
+        step = (q(ends) < r2).astype(np.int64) - ((ends > 0) & (q(ends - 1) >= r2))
+        if not step.any():
+            break
+        ends += step
+    np.clip(ends, 0, top, out=ends)
+    runs = np.diff(ends, axis=1, prepend=0, append=top)
+    half = np.repeat(np.tile(lut[::-1], h), runs.ravel()).reshape(h, top)
+
+    # Mirror the |dx| columns around the centre
+    out = np.empty((h, w), dtype=np.uint8)
+    if max(cx, 0) < w:
+        out[:, max(cx, 0):] = half[:, max(cx, 0) - cx:w - cx]
+    if cx > 0:
+        out[:, :min(cx, w)] = half[:, cx:cx - min(cx, w):-1]
+    return out
+
+
+def _make_linear_gradient_numpy(size: Tuple[int, int], start: Tuple[int, int, int], end: Tuple[int, int, int], dark: bool = False, blur_radius: float = VIGNETTE_BLUR) -> Image.Image:
+    w, h = size
+    with _stage("gradient.ramp"):
+        # Linear ramp, one row: int(lerp(...)) truncation as in lerp_color
+        t = np.arange(w, dtype=np.float64) / max(1, (w - 1))
+        c1 = np.asarray(start, dtype=np.float64)
+        c2 = np.asarray(end, dtype=np.float64)
+        ramp = (c1[None, :] + (c2 - c1)[None, :] * t[:, None]).astype(np.uint16)
+
+    # Radial highlight: ring mask computed in one pass, blurred by PIL's C box blur
+    with _stage("gradient.vignette"):
+        rings = Image.fromarray(_vignette_rings(w, h), mode="L")
+    with _stage("gradient.blur"):
+        vignette = np.asarray(rings.filter(ImageFilter.GaussianBlur(blur_radius)), dtype=np.uint16)
+
+    # White highlight over the ramp is c + (255 - c) * v / 255 with PIL's rounding;
+    # the dark overlay scales the result by (255 - alpha) / 255. Done per channel in uint16.
+    with _stage("gradient.composite"):
+        bands = []
+        tmp = np.empty((h, w), dtype=np.uint16)
+        for ch in range(3):
+            c = ramp[:, ch]
+            np.multiply(vignette, (255 - c)[None, :], out=tmp)
+            _div255(tmp)
+            tmp += c[None, :]
+            if dark:
+                tmp *= 255 - DARK_OVERLAY_ALPHA
+                _div255(tmp)
+            bands.append(Image.fromarray(tmp.astype(np.uint8), mode="L"))
+        return Image.merge("RGB", bands)
 
 
 def derive_gradient_from_logo(logo_path: str) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]] | None:
     """Pick two distinct dominant colors from the logo to use as gradient endpoints.
     Returns (start, end) in RGB or None on failure.
     """
+    asset = get_logo_asset(logo_path)
+    return asset.palette() if asset else None
+
+
+LOGO_VARIANT_FILES = 256  # resized logos kept in logo_variant_dir() before the oldest are pruned
+
+
+def logo_variant_dir() -> Path:
+    """Where resized logos are persisted, by logo content hash and width."""
+    return cache_dir() / "logo_variants"
+
+
+class LogoAsset:
+    """A logo decoded on first use, with its derived palette and resized variants memoized.
+
+    ``variant(width)`` returns the resized logo and its drop shadow; the most
+    recently used ``max_variants`` widths are kept. Resized logos are also saved
+    in logo_variant_dir() and the palette in the palette cache, so a run that finds
+    both there never decodes the full-size logo.
+    """
+
+    def __init__(self, path: str, image: Optional[Image.Image] = None, max_variants: int = 8, size: Optional[Tuple[int, int]] = None):
+        self.path = path
+        self._image = image
+        self._size = image.size if image is not None else size
+        self.max_variants = max_variants
+        self._palette: Tuple[Tuple[int, int, int], Tuple[int, int, int]] | None = None
+        self._palette_done = False
+        self._variants: OrderedDict[int, Tuple[Image.Image, Image.Image]] = OrderedDict()
+
+    @classmethod
+    def open(cls, path: str, max_variants: int = 8) -> "LogoAsset":
+        """Open ``path``; raises like Image.open() when the logo cannot be decoded.
+
+        A file whose content already has a palette in the palette cache was decoded
+        successfully before, so only its header is read and the pixels are decoded on
+        first use of ``image``. Anything else is decoded here, so a truncated or corrupt
+        logo is rejected up front (and skipped by get_logo_asset) rather than mid-render.
+        """
+        from banner_palette import get_palette_cache
+
+        digest = _file_digest(path)
+        if not digest or get_palette_cache().get(digest) is None:
+            return cls(path, Image.open(path).convert("RGBA"), max_variants=max_variants)
+        with Image.open(path) as im:
+            size = im.size
+        return cls(path, max_variants=max_variants, size=size)
+
+    @property
+    def image(self) -> Image.Image:
+        if self._image is None:
+            with _stage("logo.decode"):
+                self._image = Image.open(self.path).convert("RGBA")
+        return self._image
+
+    @property
+    def width(self) -> int:
+        return self._size[0]
+
+    @property
+    def height(self) -> int:
+        return self._size[1]
+
+    def palette(self) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]] | None:
+        """Gradient pair from the logo colors, from the persistent palette cache when possible."""
+        if not self._palette_done:
+            from banner_palette import _palette_pair_from_image, get_palette_cache
+
+            digest = _file_digest(self.path)
+            cache = get_palette_cache()
+            if digest and digest in cache:
+                self._palette = cache.get(digest)
+            else:
+                self._palette = _palette_pair_from_image(self.image)
+                if digest:
+                    cache.put(digest, self._palette)
+                    cache.save()
+            self._palette_done = True
+        return self._palette
+
+    def variant(self, width: int) -> Tuple[Image.Image, Image.Image]:
+        """Return ``(logo, shadow)`` resized to ``width`` (LANCZOS), from the LRU when possible."""
+        cached = self._variants.get(width)
+        if cached is not None:
+            self._variants.move_to_end(width)
+            return cached
+        with _stage("logo.resize_shadow"):
+            w_percent = width / self.width
+            new_size = (width, max(1, int(self.height * w_percent)))
+            digest = _file_digest(self.path)
+            stored = logo_variant_dir() / f"{digest}-{width}.png" if digest and _PERSIST_CACHES.get() else None
+            logo = _load_logo_variant(stored, new_size) if stored else None
+            if logo is None:
+                logo = self.image.resize(new_size, Image.LANCZOS)
+                if stored:
+                    _store_logo_variant(stored, logo)
+
+            # Slight drop shadow for the logo
+            shadow = Image.new("RGBA", logo.size, (0, 0, 0, 0))
+            sh = Image.new("RGBA", logo.size, SHADOW_COLOR)
+            shadow = Image.alpha_composite(shadow, sh)
+            shadow = shadow.filter(ImageFilter.GaussianBlur(6))
+
+        self._variants[width] = (logo, shadow)
+        if len(self._variants) > self.max_variants:
+            self._variants.popitem(last=False)
+        return logo, shadow
+
+
+def _load_logo_variant(path: Path, size: Tuple[int, int]) -> Optional[Image.Image]:
+    try:
+        with Image.open(path) as im:
+            im.load()
+            if im.mode == "RGBA" and im.size == size:
+                return im.copy()
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _store_logo_variant(path: Path, logo: Image.Image) -> None:
+    # PNG is lossless, so a stored variant composites exactly like a fresh resize
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".variant.", suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            logo.save(fh, format="PNG", compress_level=1)
+        os.replace(tmp, path)
+        stored = sorted(path.parent.glob("*.png"), key=lambda p: p.stat().st_mtime_ns)
+        for old in stored[:max(0, len(stored) - LOGO_VARIANT_FILES)]:
+            old.unlink()
+    except OSError:
+        pass  # read-only or racing cache dir: the variant is simply recomputed next time
+
+
+_LOGO_ASSETS: OrderedDict[Tuple[str, int, int], LogoAsset] = OrderedDict()
+LOGO_CACHE_SIZE = 4
+
+
+def get_logo_asset(logo_path: Optional[str]) -> Optional[LogoAsset]:
+    """Return the in-process cached LogoAsset for ``logo_path`` (None if missing/unreadable).
+
+    Entries are keyed by path, mtime and file size, so an edited logo is decoded again.
+    """
     if not logo_path or not os.path.isfile(logo_path):
         return None
+    st = os.stat(logo_path)
+    key = (os.path.abspath(logo_path), st.st_mtime_ns, st.st_size)
+    asset = _LOGO_ASSETS.get(key)
+    if asset is not None:
+        _LOGO_ASSETS.move_to_end(key)
+        return asset
     try:
-        img = Image.open(logo_path).convert("RGBA")
+        asset = LogoAsset.open(logo_path)
     except Exception:
         return None
+    _LOGO_ASSETS[key] = asset
+    if len(_LOGO_ASSETS) > LOGO_CACHE_SIZE:
+        _LOGO_ASSETS.popitem(last=False)
+    return asset
+
+
+# Common system fonts, tried in this order before anything found by the index
+DEFAULT_FONT_PATHS = [
+    # Windows
+    r"C:\Windows\Fonts\SegoeUI-Semibold.ttf",
+    r"C:\Windows\Fonts\SegoeUI-Bold.ttf",
+    r"C:\Windows\Fonts\arialbd.ttf",
+    r"C:\Windows\Fonts\arial.ttf",
+    # DejaVu (often available in many environments)
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+]
+# The same fonts by file name, looked up in the index when none of the paths exist
+DEFAULT_FONT_NAMES = [
+    # Windows
+    "SegoeUI-Semibold.ttf",
+    "SegoeUI-Bold.ttf",
+    "arialbd.ttf",
+    "arial.ttf",
+    # DejaVu (often available in many environments)
+    "DejaVuSans-Bold.ttf",
+    "DejaVuSans.ttf",
+]
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+
+def cache_dir() -> Path:
+    """Directory for persistent generator caches (override with BANNER_CACHE_DIR)."""
+    override = os.environ.get("BANNER_CACHE_DIR")
+    if override:
+        return Path(override)
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "conecta-libras-banner"
 
-    # Remove transparent pixels and dark borders by compositing over white
-    if img.mode == "RGBA":
-        bg = Image.new("RGBA", img.size, (255, 255, 255, 255))
-        img = Image.alpha_composite(bg, img)
-    img = img.convert("RGB")
-    # Reduce for speed and quantize to get a small palette
-    thumb = img.copy()
-    thumb.thumbnail((256, 256), Image.LANCZOS)
-    quant = thumb.quantize(colors=8, method=Image.Quantize.MEDIANCUT)
-    palette = quant.getpalette()
-    colors = []
-    if palette:
-        for i in range(0, min(8, quant.getcolors().__len__() if quant.getcolors() else 8)):
-            r, g, b = palette[3 * i: 3 * i + 3]
-            colors.append((r, g, b))
-    # Fallback: sample pixels if palette failed
-    if not colors:
-        colors = [thumb.getpixel((int(thumb.width * x / 5), int(thumb.height * y / 5)))
-                  for x in range(1, 5) for y in range(1, 5)]
-
-    # Filter near-gray and very dark/very light extremes
-    filtered = []
-    for c in colors:
-        if _is_grayish(c):
-            continue
-        if sum(c) < 80 or sum(c) > 720:  # remove almost black/white
-            continue
-        filtered.append(c)
-    if not filtered:
-        filtered = colors or [(34, 110, 255), (136, 58, 255)]
-
-    # Choose the pair with max distance
-    best_pair = None
-    best_d = -1.0
-    for i in range(len(filtered)):
-        for j in range(i + 1, len(filtered)):
-            d = _color_distance(filtered[i], filtered[j])
-            if d > best_d:
-                best_d = d
-                best_pair = (filtered[i], filtered[j])
-    if not best_pair:
-        return None
 
-    # Prefer cooler color as start (left) and warmer as end (right)
-    def warmness(c):
-        r, g, b = c
-        return r - b
-    c1, c2 = best_pair
-    return (c1, c2) if warmness(c1) < warmness(c2) else (c2, c1)
+# Off by default, so library and server renders only use in-process caches; the CLI turns it on
+_PERSIST_CACHES: ContextVar[bool] = ContextVar("banner_persist_caches", default=False)
 
 
-def find_font(preferences: list[str], size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
-    # Try user-specified paths first
-    for p in preferences:
-        if p and os.path.isfile(p):
-            try:
-                return ImageFont.truetype(p, size)
-            except Exception:
-                pass
-
-    # Common system fonts
-    candidates = [
-        # Windows
-        r"C:\\Windows\\Fonts\\SegoeUI-Semibold.ttf",
-        r"C:\\Windows\\Fonts\\SegoeUI-Bold.ttf",
-        r"C:\\Windows\\Fonts\\arialbd.ttf",
-        r"C:\\Windows\\Fonts\\arial.ttf",
-        # DejaVu (often available in many environments)
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+@contextmanager
+def persistent_caches(enabled: bool = True):
+    """Use (or, with ``enabled=False``, bypass) the on-disk caches under cache_dir() inside the block."""
+    token = _PERSIST_CACHES.set(enabled)
+    try:
+        yield
+    finally:
+        _PERSIST_CACHES.reset(token)
+
+
+def _system_font_dirs() -> list[str]:
+    home = os.path.expanduser("~")
+    if os.name == "nt":
+        windir = os.environ.get("WINDIR", r"C:\Windows")
+        local = os.environ.get("LOCALAPPDATA", os.path.join(home, "AppData", "Local"))
+        return [os.path.join(local, "Microsoft", "Windows", "Fonts"), os.path.join(windir, "Fonts")]
+    return [
+        # User fonts first so they shadow system fonts with the same name
+        os.path.join(home, ".local", "share", "fonts"),
+        os.path.join(home, ".fonts"),
+        os.path.join(home, "Library", "Fonts"),
+        "/usr/local/share/fonts",
+        "/usr/share/fonts",
+        "/Library/Fonts",
+        "/System/Library/Fonts",
     ]
-    for path in candidates:
-        if os.path.isfile(path):
+
+
+class FontRegistry:
+    """Name -> path index of installed fonts (persisted in ``cache_dir()``) plus a cache of loaded fonts."""
+
+    INDEX_VERSION = 2
+
+    def __init__(self, index_path: Optional[Path] = None, font_dirs: Optional[list[str]] = None):
+        self.index_path = index_path if index_path is not None else cache_dir() / "font_index.json"
+        self.font_dirs = font_dirs if font_dirs is not None else _system_font_dirs()
+        self._index: Optional[dict[str, str]] = None
+        self._fonts: dict[Tuple[str, int], ImageFont.FreeTypeFont] = {}
+        self._resolved: dict[Tuple[str, ...], Optional[str]] = {}
+
+    @staticmethod
+    def _dir_stamps(dirs) -> dict[str, Optional[int]]:
+        # None for a directory that does not exist, so creating it also invalidates the index
+        stamps: dict[str, Optional[int]] = {}
+        for d in dirs:
             try:
-                return ImageFont.truetype(path, size)
-            except Exception:
-                continue
+                stamps[d] = os.stat(d).st_mtime_ns
+            except OSError:
+                stamps[d] = None
+        return stamps
+
+    def _scan(self) -> Tuple[dict[str, Optional[int]], dict[str, str]]:
+        """(stamps of every scanned directory, name -> path index)."""
+        stamps = self._dir_stamps(self.font_dirs)
+        index: dict[str, str] = {}
+        for d in self.font_dirs:
+            for root, dirs, files in os.walk(d):
+                dirs.sort()
+                stamps.update(self._dir_stamps([root]))
+                for fn in sorted(files):
+                    if fn.lower().endswith(FONT_EXTENSIONS):
+                        index.setdefault(fn.lower(), os.path.join(root, fn))
+        return stamps, index
+
+    def _load_index(self) -> Optional[dict[str, str]]:
+        if not _PERSIST_CACHES.get():
+            return None
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        stamps = data.get("dirs")
+        if data.get("version") != self.INDEX_VERSION or not isinstance(stamps, dict):
+            return None
+        if not set(self.font_dirs) <= stamps.keys() or self._dir_stamps(stamps) != stamps:
+            return None
+        return data.get("fonts")
+
+    def _save_index(self, stamps: dict[str, Optional[int]], index: dict[str, str]) -> None:
+        if not _PERSIST_CACHES.get():
+            return
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            # A unique temp name, as several worker processes may rebuild the index at once
+            fd, tmp = tempfile.mkstemp(dir=self.index_path.parent, prefix=".font_index.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump({"version": self.INDEX_VERSION, "dirs": stamps, "fonts": index}, fh)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            pass  # the index is only a cache
+
+    @property
+    def index(self) -> dict[str, str]:
+        if self._index is None:
+            index = self._load_index()
+            if index is None:
+                stamps, index = self._scan()
+                self._save_index(stamps, index)
+            self._index = index
+        return self._index
+
+    def refresh(self) -> None:
+        """Rescan the font directories and rewrite the persisted index."""
+        self._index = None
+        self._resolved.clear()
+        stamps, self._index = self._scan()
+        self._save_index(stamps, self._index)
+
+    def forget(self, path: str) -> None:
+        """Drop the loaded faces of ``path`` and the resolved preferences, e.g. after the file changed."""
+        for key in [key for key in self._fonts if key[0] == path]:
+            del self._fonts[key]
+        self._resolved.clear()
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Path of an installed font by file name (case-insensitive, extension optional)."""
+        path = self._lookup(name)
+        if path and not os.path.isfile(path):
+            # Deleted since the index was built (directory mtimes can miss it): rescan once
+            self.refresh()
+            path = self._lookup(name)
+        return path
+
+    def _lookup(self, name: str) -> Optional[str]:
+        key = os.path.basename(name).lower()
+        if key.endswith(FONT_EXTENSIONS):
+            return self.index.get(key)
+        for ext in FONT_EXTENSIONS:
+            path = self.index.get(key + ext)
+            if path:
+                return path
+        return None
+
+    def resolve(self, preferences: list[str]) -> Optional[str]:
+        """First usable font among ``preferences`` (paths or names), then the default fonts."""
+        key = tuple(preferences)
+        if key not in self._resolved:
+            self._resolved[key] = self._resolve(preferences)
+        return self._resolved[key]
+
+    def _resolve(self, preferences: list[str]) -> Optional[str]:
+        # Try user-specified paths first, then the same entries as installed font names,
+        # then the common system fonts at their usual paths and, failing those, by name
+        candidates = [p for p in preferences if p and os.path.isfile(p)]
+        candidates += [self.lookup(p) for p in preferences if p and not os.path.isfile(p)]
+        candidates += [p for p in DEFAULT_FONT_PATHS if os.path.isfile(p)]
+        for path in candidates:
+            if path and self._usable(path):
+                return path
+        for name in DEFAULT_FONT_NAMES:
+            path = self.lookup(name)
+            if path and self._usable(path):
+                return path
+        return None
+
+    def _usable(self, path: str) -> bool:
+        try:
+            self.font(path, 12)
+        except Exception:
+            return False
+        return True
+
+    def font(self, path: str, size: int) -> ImageFont.FreeTypeFont:
+        key = (path, size)
+        font = self._fonts.get(key)
+        if font is None:
+            font = ImageFont.truetype(path, size)
+            self._fonts[key] = font
+        return font
+
+
+_FONT_REGISTRY: Optional[FontRegistry] = None
+
+
+def get_font_registry() -> FontRegistry:
+    global _FONT_REGISTRY
+    if _FONT_REGISTRY is None:
+        _FONT_REGISTRY = FontRegistry()
+    return _FONT_REGISTRY
+
 
+def find_font(preferences: list[str], size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    registry = get_font_registry()
+    path = registry.resolve(preferences)
+    if path:
+        return registry.font(path, size)
     # Fallback PIL bitmap font
     return ImageFont.load_default()
 
 
-def draw_text_with_shadow(draw: ImageDraw.ImageDraw, position: Tuple[int, int], text: str, font: ImageFont.ImageFont, fill: Tuple[int, int, int], shadow_offset=(2, 2)):
-    x, y = position
-    # Shadow
-    if isinstance(fill, tuple) and len(fill) == 3:
-        shadow_fill = (0, 0, 0)
-    else:
-        shadow_fill = (0, 0, 0, 128)
-    draw.text((x + shadow_offset[0], y + shadow_offset[1]), text, font=font, fill=shadow_fill)
-    # Text
-    draw.text((x, y), text, font=font, fill=fill)
+def fit_text(draw: ImageDraw.ImageDraw, text: str, target_width: int, base_font_paths: list[str], max_size: int, min_size: int = 18) -> ImageFont.ImageFont:
+    """Largest font in max_size, max_size - 2, ... >= min_size whose text fits target_width, else min_size."""
+    sizes = list(range(max_size, min_size - 1, -2))
+
+    def fits(size: int) -> bool:
+        bbox = draw.textbbox((0, 0), text, font=find_font(base_font_paths, size))
+        return bbox[2] - bbox[0] <= target_width
+
+    with _stage("fit_text"):
+        lo, hi = 0, len(sizes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if fits(sizes[mid]):
+                hi = mid
+            else:
+                lo = mid + 1
+        return find_font(base_font_paths, sizes[lo] if lo < len(sizes) else min_size)
+
+
+def banner_colors(logo: Optional[LogoAsset], palette_from_logo: bool = True) -> Tuple[Tuple[int, int, int], Tuple[int, int, int]]:
+    """Gradient start/end colors: the logo palette when enabled and usable, else the defaults."""
+    # Optional: derive gradient from logo palette
+    if palette_from_logo and logo:
+        with _stage("palette"):
+            pair = logo.palette()
+        if pair:
+            return pair
+    return BG_GRADIENT_START, BG_GRADIENT_END
 
 
-def fit_text(draw: ImageDraw.ImageDraw, text: str, target_width: int, base_font_paths: list[str], max_size: int, min_size: int = 18) -> ImageFont.ImageFont:
-    size = max_size
-    while size >= min_size:
-        font = find_font(base_font_paths, size)
-        bbox = draw.textbbox((0, 0), text, font=font)
-        width = bbox[2] - bbox[0]
-        if width <= target_width:
-            return font
-        size -= 2
-    return find_font(base_font_paths, min_size)
-
-
-def place_logo(canvas: Image.Image, logo_path: Optional[str], margin: int, scale_width: Optional[int] = None, allow_upscale: bool = True) -> None:
-    if not logo_path or not os.path.isfile(logo_path):
-        return
+class TextLayout(NamedTuple):
+    """Fitted fonts and top-left positions of the title and subtitle on one canvas size."""
 
-    try:
-        logo = Image.open(logo_path).convert("RGBA")
-    except Exception:
+    title: str
+    subtitle: str
+    title_font: ImageFont.ImageFont
+    subtitle_font: ImageFont.ImageFont
+    title_xy: Tuple[int, int]
+    subtitle_xy: Tuple[int, int]
+    shadow: str = "hard"
+
+
+def layout_text(
+    size: Tuple[int, int],
+    title: str,
+    subtitle: str,
+    margin: int = DEFAULT_MARGIN,
+    title_font_paths: Optional[list[str]] = None,
+    subtitle_font_paths: Optional[list[str]] = None,
+    subtitle_gap_factor: float = 1.35,
+    text_shift_ratio: float = 0.0,
+    text_shadow: str = "hard",
+) -> TextLayout:
+    """Fit the title and subtitle to ``size`` and center the text block."""
+    if text_shadow not in TEXT_SHADOWS:
+        raise ValueError(f"Unknown text shadow: {text_shadow!r} (expected one of {', '.join(TEXT_SHADOWS)})")
+    # Measuring only; the layout does not depend on the canvas pixels
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+    safe_w = size[0] - margin * 2
+
+    # Title
+    title_font = fit_text(draw, title, safe_w, [*(title_font_paths or [])], max_size=112, min_size=32)
+    title_bbox = draw.textbbox((0, 0), title, font=title_font)
+    title_w = title_bbox[2] - title_bbox[0]
+    title_h = title_bbox[3] - title_bbox[1]
+
+    # Subtitle smaller relative to title
+    subtitle_font = fit_text(draw, subtitle, safe_w, [*(subtitle_font_paths or [])], max_size=int(max(28, 0.35 * (title_font.size))), min_size=18)
+    sub_bbox = draw.textbbox((0, 0), subtitle, font=subtitle_font)
+    sub_w = sub_bbox[2] - sub_bbox[0]
+    sub_h = sub_bbox[3] - sub_bbox[1]
+
+    total_h = title_h + int(sub_h * 1.6)
+    start_y = (size[1] - total_h) // 2
+    # Apply vertical shift (ratio of canvas height). Negative moves up.
+    start_y = int(start_y + text_shift_ratio * size[1])
+
+    title_x = (size[0] - title_w) // 2
+    sub_x = (size[0] - sub_w) // 2
+    return TextLayout(title, subtitle, title_font, subtitle_font, (title_x, start_y), (sub_x, start_y + int(title_h * subtitle_gap_factor)), text_shadow)
+
+
+class TextLayer(NamedTuple):
+    """Rasterized text: fill and shadow coverage masks with their offsets from the text origin."""
+
+    mask: Image.Image
+    offset: Tuple[int, int]
+    shadow: Image.Image
+    shadow_offset: Tuple[int, int]
+
+
+_TEXT_LAYERS: OrderedDict[tuple, TextLayer] = OrderedDict()
+TEXT_LAYER_CACHE_SIZE = 64
+
+
+def _font_key(font: ImageFont.ImageFont):
+    # Fonts loaded from the same file at the same size rasterize identically
+    path = getattr(font, "path", None)
+    if isinstance(path, str):
+        return path, font.size, getattr(font, "index", 0)
+    return font
+
+
+def get_text_layer(text: str, font: ImageFont.ImageFont, shadow_offset: Tuple[int, int] = (2, 2), shadow: str = "hard") -> TextLayer:
+    """Return the in-process cached TextLayer for ``text`` in ``font``.
+
+    Entries are keyed by (text, font file, size, shadow offset, shadow style), so a
+    title repeated across sizes and themes is rasterized by FreeType only once.
+    """
+    key = (text, _font_key(font), tuple(shadow_offset), shadow)
+    layer = _TEXT_LAYERS.get(key)
+    if layer is not None:
+        _TEXT_LAYERS.move_to_end(key)
+        return layer
+    with _stage("text.rasterize"):
+        left, top, right, bottom = font.getbbox(text)
+        mask = Image.new("L", (max(1, right - left), max(1, bottom - top)), 0)
+        # The coverage draw.text() blends with; pasting the ink through it gives the same pixels
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+        dx, dy = shadow_offset
+        if shadow == "hard":
+            layer = TextLayer(mask, (left, top), mask, (left + dx, top + dy))
+        else:
+            radius = max(1.0, SOFT_SHADOW_BLUR * getattr(font, "size", 10))
+            pad = math.ceil(3 * radius)
+            soft = Image.new("L", (mask.width + 2 * pad, mask.height + 2 * pad), 0)
+            soft.paste(mask.point(lambda v: v * SOFT_SHADOW_ALPHA // 255), (pad, pad))
+            soft = soft.filter(ImageFilter.GaussianBlur(radius))
+            layer = TextLayer(mask, (left, top), soft, (left + dx - pad, top + dy - pad))
+    _TEXT_LAYERS[key] = layer
+    if len(_TEXT_LAYERS) > TEXT_LAYER_CACHE_SIZE:
+        _TEXT_LAYERS.popitem(last=False)
+    return layer
+
+
+def composite_text(canvas: Image.Image, layer: TextLayer, xy: Tuple[int, int], fill: Tuple[int, int, int] = TEXT_COLOR) -> None:
+    """Paste black through the shadow mask, then ``fill`` through the text mask, with the text origin at ``xy``."""
+    for color, mask, (ox, oy) in (((0, 0, 0), layer.shadow, layer.shadow_offset), (fill, layer.mask, layer.offset)):
+        x, y = xy[0] + ox, xy[1] + oy
+        canvas.paste(color, (x, y, x + mask.width, y + mask.height), mask)
+
+
+def draw_text_layout(canvas: Image.Image, layout: TextLayout, shadow_scale: float = 1.0) -> None:
+    def offset(dx: int, dy: int) -> Tuple[int, int]:
+        return max(1, round(dx * shadow_scale)), max(1, round(dy * shadow_scale))
+
+    with _stage("text.draw"):
+        # Subtle shadow for legibility; layers are cached across canvases
+        composite_text(canvas, get_text_layer(layout.title, layout.title_font, offset(2, 3), layout.shadow), layout.title_xy)
+        composite_text(canvas, get_text_layer(layout.subtitle, layout.subtitle_font, offset(1, 2), layout.shadow), layout.subtitle_xy)
+
+
+def scale_text_layout(layout: TextLayout, scale: float) -> TextLayout:
+    """``layout`` for a canvas scaled by ``scale``: the same fonts at scaled sizes, scaled positions."""
+    registry = get_font_registry()
+
+    def font(f):
+        path = getattr(f, "path", None)
+        return registry.font(path, max(1, round(f.size * scale))) if isinstance(path, str) else f
+
+    def xy(point: Tuple[int, int]) -> Tuple[int, int]:
+        return round(point[0] * scale), round(point[1] * scale)
+
+    return layout._replace(title_font=font(layout.title_font), subtitle_font=font(layout.subtitle_font), title_xy=xy(layout.title_xy), subtitle_xy=xy(layout.subtitle_xy))
+
+
+def logo_width(size: Tuple[int, int], logo_scale: float = 1.0) -> int:
+    """Logo width for a canvas: 16% of its width times ``logo_scale``."""
+    # Base width heuristic (16% of canvas width), then apply user scale
+    base_logo_w = int(size[0] * 0.16)
+    # Allow much smaller logos; keep a tiny lower bound for safety
+    return max(16, int(base_logo_w * max(0.02, logo_scale)))
+
+
+def place_logo(canvas: Image.Image, logo_path: Optional[str | LogoAsset], margin: int, scale_width: Optional[int] = None, allow_upscale: bool = True) -> None:
+    asset = logo_path if isinstance(logo_path, LogoAsset) else get_logo_asset(logo_path)
+    if asset is None:
         return
 
     # Scale logo
@@ -214,30 +970,265 @@ def place_logo(canvas: Image.Image, logo_path: Optional[str], margin: int, scale
         scale_width = max(140, int(canvas.width * 0.16))  # responsive but bounded
     # Optionally avoid upscaling; when allow_upscale is False, clamp to original width
     if not allow_upscale:
-        scale_width = min(scale_width, logo.width)
-    w_percent = scale_width / logo.width
-    new_size = (scale_width, max(1, int(logo.height * w_percent)))
-    logo = logo.resize(new_size, Image.LANCZOS)
+        scale_width = min(scale_width, asset.width)
+    logo, shadow = asset.variant(scale_width)
+    composite_logo(canvas, logo, shadow, margin)
 
-    # Slight drop shadow for the logo
-    shadow = Image.new("RGBA", logo.size, (0, 0, 0, 0))
-    sh = Image.new("RGBA", logo.size, SHADOW_COLOR)
-    shadow = Image.alpha_composite(shadow, sh)
-    shadow = shadow.filter(ImageFilter.GaussianBlur(6))
 
+def composite_logo(canvas: Image.Image, logo: Image.Image, shadow: Image.Image, margin: int) -> None:
+    """Composite a resized logo and its shadow (see LogoAsset.variant) bottom-right."""
     x = canvas.width - logo.width - margin
     y = canvas.height - logo.height - margin
 
-    # Paste shadow first
-    canvas.alpha_composite(shadow, dest=(x + 4, y + 4))
-    # Then the logo
-    canvas.alpha_composite(logo, dest=(x, y))
+    with _stage("logo.composite"):
+        # Paste shadow first
+        canvas.alpha_composite(shadow, dest=(x + 4, y + 4))
+        # Then the logo
+        canvas.alpha_composite(logo, dest=(x, y))
+
+
+class EncodingProfile(NamedTuple):
+    """Encoder settings for the PNG, JPEG, WebP and AVIF outputs."""
+
+    png_compress_level: int = 6
+    png_optimize: bool = False
+    jpeg_quality: int = 92
+    jpeg_optimize: bool = True
+    jpeg_progressive: bool = False
+    jpeg_subsampling: int = 1
+    webp_quality: int = 90
+    webp_method: int = 4
+    avif_quality: int = 60
+
+
+ENCODING_PROFILES = {
+    # Same bytes as the original canvas.save()/rgb.save() calls
+    "default": EncodingProfile(),
+    # Quick iterations: light zlib effort, no JPEG Huffman optimization
+    "fast": EncodingProfile(png_compress_level=1, jpeg_optimize=False, webp_method=0),
+    # Smallest files for shipping: max zlib effort and progressive JPEG
+    "small": EncodingProfile(png_compress_level=9, png_optimize=True, jpeg_progressive=True, webp_method=6),
+}
+
+
+def resolve_encoding(encoding: str | EncodingProfile) -> EncodingProfile:
+    if isinstance(encoding, EncodingProfile):
+        return encoding
+    if encoding not in ENCODING_PROFILES:
+        raise ValueError(f"Unknown encoding profile: {encoding!r} (expected one of {', '.join(ENCODING_PROFILES)})")
+    return ENCODING_PROFILES[encoding]
+
+
+def encode_image(canvas: Image.Image, fmt: str, profile: EncodingProfile = ENCODING_PROFILES["default"], exif_bytes: Optional[bytes] = None) -> bytes:
+    """Encode ``canvas`` to ``fmt`` in memory; PNG, JPEG and WebP use the profile's settings."""
+    buf = io.BytesIO()
+    save_encoded(canvas, buf, fmt, profile, exif_bytes)
+    return buf.getvalue()
+
+
+def save_encoded(canvas: Image.Image, buf, fmt: str, profile: EncodingProfile = ENCODING_PROFILES["default"], exif_bytes: Optional[bytes] = None) -> None:
+    """Encode ``canvas`` to ``fmt`` into the file object ``buf`` (see encode_image)."""
+    if fmt == "PNG":
+        canvas.save(buf, format="PNG", compress_level=profile.png_compress_level, optimize=profile.png_optimize)
+    elif fmt == "JPEG":
+        # RGBX (e.g. a view of an RGBA buffer) is encoded as is, without a converted copy
+        rgb = canvas if canvas.mode in ("RGB", "RGBX") else canvas.convert("RGB")
+        params = dict(quality=profile.jpeg_quality, optimize=profile.jpeg_optimize, subsampling=profile.jpeg_subsampling)
+        if profile.jpeg_progressive:
+            params["progressive"] = True
+        if exif_bytes is not None:
+            params["exif"] = exif_bytes
+        rgb.save(buf, format="JPEG", **params)
+    elif fmt == "WEBP":
+        params = dict(quality=profile.webp_quality, method=profile.webp_method)
+        if exif_bytes is not None:
+            params["exif"] = exif_bytes
+        canvas.convert("RGB").save(buf, format="WEBP", **params)
+    elif fmt == "AVIF":
+        params = dict(quality=profile.avif_quality)
+        if exif_bytes is not None:
+            params["exif"] = exif_bytes
+        canvas.convert("RGB").save(buf, format="AVIF", **params)
+    else:
+        canvas.save(buf, format=fmt)
+
+
+# In-memory format names (BannerRequest.formats) -> Pillow format
+FORMAT_NAMES = {"png": "PNG", "jpeg": "JPEG", "jpg": "JPEG", "webp": "WEBP"}
+MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp", "AVIF": "image/avif"}
+
+
+# Extensions Image.save(path) maps without loading every Pillow plugin (Image.init)
+SAVE_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP"}
+
+
+def _format_for(path: str) -> str:
+    # Same extension -> format mapping that Image.save(path) uses
+    ext = os.path.splitext(path)[1].lower()
+    if ext in SAVE_FORMATS:
+        return SAVE_FORMATS[ext]
+    return Image.registered_extensions().get(ext, "PNG")
+
+
+def write_outputs(canvas: Image.Image, output: str, jpg_output: Optional[str] = None, exif_bytes: Optional[bytes] = None, profile: EncodingProfile = ENCODING_PROFILES["default"], keep_bytes: bool = False) -> list[Tuple[str, Optional[bytes]]]:
+    """Encode and write the main output (and optional JPG); return ``(path, bytes or None)`` pairs."""
+    written = []
+    for path, fmt in ((output, _format_for(output)), (jpg_output, "JPEG")):
+        if not path:
+            continue
+        with _stage(f"encode.{fmt.lower()}"):
+            data = encode_image(canvas, fmt, profile, exif_bytes=exif_bytes if fmt == "JPEG" else None)
+        with _stage("write"), open(path, "wb") as fh:
+            fh.write(data)
+        written.append((path, data if keep_bytes else None))
+    return written
+
+
+class BackgroundWriter:
+    """Encodes and writes finished canvases on a background thread, at most ``max_pending`` queued."""
+
+    def __init__(self, encoding: str | EncodingProfile = "default", keep_bytes: bool = False, max_pending: int = 2):
+        self.profile = resolve_encoding(encoding)
+        self.keep_bytes = keep_bytes
+        self.max_pending = max(1, max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="banner-writer")
+        self._pending: deque[Tuple[object, Future]] = deque()
+
+    def submit(self, canvas: Image.Image, output: str, jpg_output: Optional[str] = None, exif_bytes: Optional[bytes] = None, tag: object = None) -> Future:
+        running = [f for _, f in self._pending if not f.done()]
+        if len(running) >= self.max_pending:
+            futures_wait(running[: len(running) - self.max_pending + 1])
+        # Run in the caller's context so encode stages land in its profiler
+        ctx = copy_context()
+        fut = self._executor.submit(ctx.run, write_outputs, canvas, output, jpg_output, exif_bytes, self.profile, self.keep_bytes)
+        self._pending.append((tag, fut))
+        return fut
+
+    def add_written(self, written: list[Tuple[str, Optional[bytes]]], tag: object = None) -> None:
+        """Queue outputs already written by the caller, so completed() reports them in order."""
+        fut: Future = Future()
+        fut.set_result(written)
+        self._pending.append((tag, fut))
+
+    def completed(self, block: bool = False):
+        """Yield ``(tag, written)`` for finished writes, oldest first; with ``block`` wait for all."""
+        while self._pending and (block or self._pending[0][1].done()):
+            tag, fut = self._pending.popleft()
+            yield tag, fut.result()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "BackgroundWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def darken_background(bg: Image.Image) -> Image.Image:
+    """Apply the dark-theme overlay (35% black) to an already rendered background."""
+    # Same result as compositing black with a constant DARK_OVERLAY_ALPHA mask
+    lut = [(v * (255 - DARK_OVERLAY_ALPHA) + 128 + ((v * (255 - DARK_OVERLAY_ALPHA) + 128) >> 8)) >> 8 for v in range(256)]
+    return bg.point(lut * len(bg.getbands()))
+
+
+# Low-memory rendering: rough peak Pillow image memory per output pixel
+FULL_RENDER_BYTES_PER_PIXEL = 16  # background, RGBA canvas, RGB copy for JPEG, encoder buffers
+STRIP_BYTES_PER_PIXEL = 16  # upsampled strip, dark copy, RGBA strip and its raw bytes
+STRIP_OVERHEAD_BYTES = 8 << 20  # zlib/libjpeg state, fonts
+MIN_STRIP_ROWS = 8
+
+
+def full_render_bytes(size: Tuple[int, int]) -> int:
+    """Estimated peak image memory of rendering ``size`` on one full canvas."""
+    return FULL_RENDER_BYTES_PER_PIXEL * size[0] * size[1]
+
+
+def strip_rows(size: Tuple[int, int], fixed_bytes: int, max_memory: int) -> int:
+    """Rows per strip so that ``fixed_bytes`` plus one strip stays under ``max_memory``."""
+    budget = max_memory - fixed_bytes - STRIP_OVERHEAD_BYTES
+    rows = budget // (STRIP_BYTES_PER_PIXEL * size[0]) if budget > 0 else 0
+    if rows < MIN_STRIP_ROWS:
+        need = (fixed_bytes + STRIP_OVERHEAD_BYTES + MIN_STRIP_ROWS * STRIP_BYTES_PER_PIXEL * size[0]) / (1 << 20)
+        raise ValueError(f"A {size[0]}x{size[1]} banner needs a memory ceiling of at least {math.ceil(need)} MB")
+    return min(rows, size[1])
+
+
+def write_banner_strips(
+    output: str,
+    jpg_output: Optional[str],
+    size: Tuple[int, int],
+    source: Image.Image,
+    theme: str,
+    layout: TextLayout,
+    logo: Optional[Tuple[Image.Image, Image.Image]],
+    margin: int,
+    max_memory: int,
+    exif_bytes: Optional[bytes] = None,
+    profile: EncodingProfile = ENCODING_PROFILES["default"],
+) -> list[Tuple[str, None]]:
+    """Render one banner in horizontal strips through a memory-mapped scratch canvas and encode it.
+
+    Pixels match the full-canvas renderer; image memory stays near ``max_memory``.
+    """
+    w, h = size
+    fixed = 4 * source.width * source.height + (8 * logo[0].width * logo[0].height if logo else 0)
+    rows = strip_rows(size, fixed, max_memory)
+    logo_xy = (w - logo[0].width - margin, h - logo[0].height - margin) if logo else None
+    scratch_dir = os.path.dirname(os.path.abspath(output))
+    with tempfile.TemporaryFile(dir=scratch_dir) as scratch:
+        scratch.truncate(4 * w * h)
+        with mmap.mmap(scratch.fileno(), 4 * w * h) as mm:
+            for y0 in range(0, h, rows):
+                y1 = min(h, y0 + rows)
+                with _stage("strip.background"):
+                    strip = upsample_rows(source, size, y0, y1)
+                    if theme == "dark":
+                        strip = darken_background(strip)
+                    strip = strip.convert("RGBA")
+                draw_text_layout(strip, layout._replace(
+                    title_xy=(layout.title_xy[0], layout.title_xy[1] - y0),
+                    subtitle_xy=(layout.subtitle_xy[0], layout.subtitle_xy[1] - y0),
+                ))
+                if logo:
+                    with _stage("logo.composite"):
+                        _composite_clipped(strip, logo[1], (logo_xy[0] + 4, logo_xy[1] + 4 - y0))
+                        _composite_clipped(strip, logo[0], (logo_xy[0], logo_xy[1] - y0))
+                with _stage("strip.copy"):
+                    mm[4 * w * y0:4 * w * y1] = strip.tobytes()
+                del strip
+
+            written = []
+            for path, fmt in ((output, _format_for(output)), (jpg_output, "JPEG")):
+                if not path:
+                    continue
+                # Views of the mapped canvas; RGBX lets JPEG skip the alpha channel in place
+                mode = "RGBX" if fmt == "JPEG" else "RGBA"
+                view = Image.frombuffer(mode, size, mm, "raw", mode, 0, 1)
+                # The map is writable; otherwise Image.save() copies the "read-only" view
+                view.readonly = 0
+                with _stage(f"encode.{fmt.lower()}"), open(path, "wb") as fh:
+                    save_encoded(view, fh, fmt, profile._replace(jpeg_optimize=False, jpeg_progressive=False), exif_bytes if fmt == "JPEG" else None)
+                del view  # releases the buffer export before the map closes
+                written.append((path, None))
+    return written
+
+
+def _composite_clipped(canvas: Image.Image, im: Image.Image, xy: Tuple[int, int]) -> None:
+    # alpha_composite ``im`` with its top-left at ``xy``, clipped to the canvas (xy may be negative)
+    x, y = xy
+    left, top = max(x, 0), max(y, 0)
+    right, bottom = min(x + im.width, canvas.width), min(y + im.height, canvas.height)
+    if left >= right or top >= bottom:
+        return
+    canvas.alpha_composite(im, dest=(left, top), source=(left - x, top - y, right - x, bottom - y))
 
 
 def build_banner(
     title: str,
     subtitle: str,
-    logo_path: Optional[str] = None,
+    logo_path: Optional[str | LogoAsset] = None,
     output: str = "banner_conecta_libras.png",
     size: Tuple[int, int] = SIZE,
     margin: int = DEFAULT_MARGIN,
@@ -249,82 +1240,627 @@ def build_banner(
     subtitle_gap_factor: float = 1.35,
     allow_upscale_logo: bool = True,
     text_shift_ratio: float = 0.0,
+    text_shadow: str = "hard",
     dark_theme: bool = False,
     exif_artist: Optional[str] = None,
     exif_copyright: Optional[str] = None,
     exif_description: Optional[str] = None,
+    bg_engine: str = "auto",
+    quality: str = "standard",
+    encoding: str | EncodingProfile = "default",
+    max_memory: Optional[int] = None,
 ):
-    if title_font_paths is None:
-        title_font_paths = []
-    if subtitle_font_paths is None:
-        subtitle_font_paths = []
+    theme = "dark" if dark_theme else "light"
+    return build_banner_themes(
+        {theme: (output, jpg_output)},
+        title=title,
+        subtitle=subtitle,
+        logo_path=logo_path,
+        size=size,
+        margin=margin,
+        title_font_paths=title_font_paths,
+        subtitle_font_paths=subtitle_font_paths,
+        palette_from_logo=palette_from_logo,
+        logo_scale=logo_scale,
+        subtitle_gap_factor=subtitle_gap_factor,
+        allow_upscale_logo=allow_upscale_logo,
+        text_shift_ratio=text_shift_ratio,
+        text_shadow=text_shadow,
+        exif_artist=exif_artist,
+        exif_copyright=exif_copyright,
+        exif_description=exif_description,
+        bg_engine=bg_engine,
+        quality=quality,
+        encoding=encoding,
+        max_memory=max_memory,
+    )[theme]
+
+
+def iter_banner_canvases(
+    themes: list[str],
+    title: str,
+    subtitle: str,
+    logo_path: Optional[str | LogoAsset] = None,
+    size: Tuple[int, int] = SIZE,
+    margin: int = DEFAULT_MARGIN,
+    title_font_paths: Optional[list[str]] = None,
+    subtitle_font_paths: Optional[list[str]] = None,
+    palette_from_logo: bool = True,
+    logo_scale: float = 1.0,
+    subtitle_gap_factor: float = 1.35,
+    allow_upscale_logo: bool = True,
+    text_shift_ratio: float = 0.0,
+    text_shadow: str = "hard",
+    bg_engine: str = "auto",
+    quality: str = "standard",
+) -> Iterator[Tuple[str, Image.Image]]:
+    """Yield ``(theme, RGBA canvas)`` for one banner size in each of ``themes``.
+
+    The logo, palette, light background and text layout are computed once; the
+    dark theme is derived from the light background. Canvases are produced lazily,
+    so a caller can encode one theme while the next is drawn.
+    """
+    for theme in themes:
+        if theme not in THEMES:
+            raise ValueError(f"Unknown theme: {theme!r} (expected one of {', '.join(THEMES)})")
+    # Decode the logo once (cached per process) for both the palette and placement
+    logo = logo_path if isinstance(logo_path, LogoAsset) else get_logo_asset(logo_path)
+    grad_start, grad_end = banner_colors(logo, palette_from_logo)
+
+    with _stage("gradient"):
+        light_bg = make_linear_gradient(size, grad_start, grad_end, dark=False, engine=bg_engine, quality=quality)
+
+    layout = layout_text(size, title, subtitle, margin, title_font_paths, subtitle_font_paths, subtitle_gap_factor, text_shift_ratio, text_shadow)
+    scaled_logo_w = logo_width(size, logo_scale)
+
+    for theme in themes:
+        with _stage("theme.canvas"):
+            bg = darken_background(light_bg) if theme == "dark" else light_bg
+            canvas = bg.convert("RGBA")
+        draw_text_layout(canvas, layout)
+        place_logo(canvas, logo, margin=margin, scale_width=scaled_logo_w, allow_upscale=allow_upscale_logo)
+        yield theme, canvas
+
+
+def build_banner_themes(
+    outputs: dict[str, Tuple[str, Optional[str]]],
+    title: str,
+    subtitle: str,
+    logo_path: Optional[str | LogoAsset] = None,
+    size: Tuple[int, int] = SIZE,
+    margin: int = DEFAULT_MARGIN,
+    title_font_paths: Optional[list[str]] = None,
+    subtitle_font_paths: Optional[list[str]] = None,
+    palette_from_logo: bool = True,
+    logo_scale: float = 1.0,
+    subtitle_gap_factor: float = 1.35,
+    allow_upscale_logo: bool = True,
+    text_shift_ratio: float = 0.0,
+    text_shadow: str = "hard",
+    bg_engine: str = "auto",
+    quality: str = "standard",
+    exif_artist: Optional[str] = None,
+    exif_copyright: Optional[str] = None,
+    exif_description: Optional[str] = None,
+    encoding: str | EncodingProfile = "default",
+    writer: Optional[BackgroundWriter] = None,
+    max_memory: Optional[int] = None,
+) -> dict[str, str]:
+    """Render one size in each theme of ``outputs`` (theme -> (png, jpg or None)); return theme -> PNG path.
 
-    # Optional: derive gradient from logo palette
-    grad_start, grad_end = BG_GRADIENT_START, BG_GRADIENT_END
-    if palette_from_logo and logo_path:
-        pair = derive_gradient_from_logo(logo_path)
-        if pair:
-            grad_start, grad_end = pair
+    A ``writer`` encodes in the background; sizes over ``max_memory`` bytes are written in strips.
+    """
+    profile = writer.profile if writer is not None else resolve_encoding(encoding)
+    exif_bytes = _exif_bytes(exif_artist, exif_copyright, exif_description)
+    if max_memory is not None and full_render_bytes(size) > max_memory:
+        if quality not in QUALITY_TIERS or QUALITY_TIERS[quality] is None:
+            raise ValueError(f"Rendering {size[0]}x{size[1]} under a memory ceiling needs a reduced-resolution background (--quality draft or standard)")
+        for theme in outputs:
+            if theme not in THEMES:
+                raise ValueError(f"Unknown theme: {theme!r} (expected one of {', '.join(THEMES)})")
+        logo = logo_path if isinstance(logo_path, LogoAsset) else get_logo_asset(logo_path)
+        start, end = banner_colors(logo, palette_from_logo)
+        with _stage("gradient"):
+            source = make_background_source(size, start, end, engine=bg_engine, quality=quality)
+        layout = layout_text(size, title, subtitle, margin, title_font_paths, subtitle_font_paths, subtitle_gap_factor, text_shift_ratio, text_shadow)
+        variant = None
+        if logo is not None:
+            width = logo_width(size, logo_scale)
+            variant = logo.variant(width if allow_upscale_logo else min(width, logo.width))
+        for theme, (output, jpg_output) in outputs.items():
+            written = write_banner_strips(output, jpg_output, size, source, theme, layout, variant, margin, max_memory, exif_bytes, profile)
+            if writer is not None:
+                writer.add_written(written, tag=theme)
+        return {theme: output for theme, (output, _) in outputs.items()}
+
+    canvases = iter_banner_canvases(
+        list(outputs),
+        title=title,
+        subtitle=subtitle,
+        logo_path=logo_path,
+        size=size,
+        margin=margin,
+        title_font_paths=title_font_paths,
+        subtitle_font_paths=subtitle_font_paths,
+        palette_from_logo=palette_from_logo,
+        logo_scale=logo_scale,
+        subtitle_gap_factor=subtitle_gap_factor,
+        allow_upscale_logo=allow_upscale_logo,
+        text_shift_ratio=text_shift_ratio,
+        text_shadow=text_shadow,
+        bg_engine=bg_engine,
+        quality=quality,
+    )
 
-    bg = make_linear_gradient(size, grad_start, grad_end, dark=dark_theme)
-    canvas = bg.convert("RGBA")
-    draw = ImageDraw.Draw(canvas)
+    saved = {}
+    for theme, canvas in canvases:
+        output, jpg_output = outputs[theme]
+        # PNG (and JPG if requested), now or on the writer thread
+        if writer is not None:
+            writer.submit(canvas, output, jpg_output, exif_bytes, tag=theme)
+        else:
+            write_outputs(canvas, output, jpg_output, exif_bytes, profile)
+        saved[theme] = output
+    return saved
 
-    # Compute text layout
-    safe_w = size[0] - margin * 2
 
-    # Title
-    title_font = fit_text(draw, title, safe_w, [*title_font_paths], max_size=112, min_size=32)
-    title_bbox = draw.textbbox((0, 0), title, font=title_font)
-    title_w = title_bbox[2] - title_bbox[0]
-    title_h = title_bbox[3] - title_bbox[1]
+class BannerRequest(NamedTuple):
+    """Everything needed to render one banner in memory (see render_banner).
 
-    # Subtitle smaller relative to title
-    subtitle_font = fit_text(draw, subtitle, safe_w, [*subtitle_font_paths], max_size=int(max(28, 0.35 * (title_font.size))), min_size=18)
-    sub_bbox = draw.textbbox((0, 0), subtitle, font=subtitle_font)
-    sub_w = sub_bbox[2] - sub_bbox[0]
-    sub_h = sub_bbox[3] - sub_bbox[1]
+    ``formats`` lists the encodings to return: any of "png", "jpeg" (or "jpg")
+    and "webp". EXIF fields are embedded in the JPEG and WebP encodings.
+    ``persist_caches`` also reads and updates the on-disk caches under cache_dir().
+    Requests are hashable, so they can key caches.
+    """
 
-    total_h = title_h + int(sub_h * 1.6)
-    start_y = (size[1] - total_h) // 2
-    # Apply vertical shift (ratio of canvas height). Negative moves up.
-    start_y = int(start_y + text_shift_ratio * size[1])
+    title: str = "Conecta Libras"
+    subtitle: str = "Comunicação inclusiva sem barreiras"
+    size: Tuple[int, int] = SIZE
+    theme: str = "light"
+    formats: Tuple[str, ...] = ("png",)
+    logo_path: Optional[str] = None
+    margin: int = DEFAULT_MARGIN
+    title_font_paths: Tuple[str, ...] = ()
+    subtitle_font_paths: Tuple[str, ...] = ()
+    palette_from_logo: bool = True
+    logo_scale: float = 1.0
+    subtitle_gap_factor: float = 1.35
+    allow_upscale_logo: bool = True
+    text_shift_ratio: float = 0.0
+    text_shadow: str = "hard"
+    exif_artist: Optional[str] = None
+    exif_copyright: Optional[str] = None
+    exif_description: Optional[str] = None
+    bg_engine: str = "auto"
+    quality: str = "standard"
+    encoding: str = "default"
+    persist_caches: bool = False
+
+
+class RenderedBanner(NamedTuple):
+    """Encoded images for a BannerRequest, keyed by requested format name."""
+
+    request: BannerRequest
+    images: dict[str, bytes]
+
+    def buffer(self, fmt: str) -> io.BytesIO:
+        """The encoded image as a readable in-memory file."""
+        return io.BytesIO(self.images[fmt])
+
+    @staticmethod
+    def mime_type(fmt: str) -> str:
+        return MIME_TYPES[FORMAT_NAMES[fmt.lower()]]
+
+
+def render_banner(request: BannerRequest) -> RenderedBanner:
+    """Render ``request`` and return its encodings as bytes, without writing any file.
+
+    Only in-process caches are used unless ``request.persist_caches`` is set.
+    """
+    with persistent_caches(request.persist_caches):
+        return _render_banner(request)
+
+
+def _render_banner(request: BannerRequest) -> RenderedBanner:
+    for fmt in request.formats:
+        if fmt.lower() not in FORMAT_NAMES:
+            raise ValueError(f"Unsupported format: {fmt!r} (expected one of {', '.join(FORMAT_NAMES)})")
+    profile = resolve_encoding(request.encoding)
+    exif_bytes = _exif_bytes(request.exif_artist, request.exif_copyright, request.exif_description)
+    ((_, canvas),) = iter_banner_canvases(
+        [request.theme],
+        title=request.title,
+        subtitle=request.subtitle,
+        logo_path=request.logo_path,
+        size=tuple(request.size),
+        margin=request.margin,
+        title_font_paths=list(request.title_font_paths),
+        subtitle_font_paths=list(request.subtitle_font_paths),
+        palette_from_logo=request.palette_from_logo,
+        logo_scale=request.logo_scale,
+        subtitle_gap_factor=request.subtitle_gap_factor,
+        allow_upscale_logo=request.allow_upscale_logo,
+        text_shift_ratio=request.text_shift_ratio,
+        text_shadow=request.text_shadow,
+        bg_engine=request.bg_engine,
+        quality=request.quality,
+    )
+    images = {}
+    for fmt in request.formats:
+        pil_fmt = FORMAT_NAMES[fmt.lower()]
+        with _stage(f"encode.{pil_fmt.lower()}"):
+            images[fmt] = encode_image(canvas, pil_fmt, profile, exif_bytes=exif_bytes if pil_fmt != "PNG" else None)
+    return RenderedBanner(request, images)
 
-    title_x = (size[0] - title_w) // 2
-    sub_x = (size[0] - sub_w) // 2
 
-    # Draw with subtle shadow for legibility
-    draw_text_with_shadow(draw, (title_x, start_y), title, title_font, TEXT_COLOR, shadow_offset=(2, 3))
-    draw_text_with_shadow(draw, (sub_x, start_y + int(title_h * subtitle_gap_factor)), subtitle, subtitle_font, TEXT_COLOR, shadow_offset=(1, 2))
+# Animated banners (banner_animation.py)
+ANIMATION_FORMATS = ("webp", "apng", "gif", "frames")
+ANIMATION_MOTIONS = ("both", "drift", "highlight")
 
-    # Place logo bottom-right
-    # Base width heuristic (16% of canvas width), then apply user scale
-    base_logo_w = int(size[0] * 0.16)
-    # Allow much smaller logos; keep a tiny lower bound for safety
-    scaled_logo_w = max(16, int(base_logo_w * max(0.02, logo_scale)))
-    place_logo(canvas, logo_path, margin=margin, scale_width=scaled_logo_w, allow_upscale=allow_upscale_logo)
-
-    canvas.save(output)
-    # Export JPG if requested
-    if jpg_output:
-        rgb = canvas.convert("RGB")
-        # Embed EXIF metadata if provided
-        exif_bytes = None
-        if any([exif_artist, exif_copyright, exif_description]):
-            zeroth = {piexif.ImageIFD.Software: "make_banner.py"}
-            if exif_artist:
-                zeroth[piexif.ImageIFD.Artist] = exif_artist
-            if exif_copyright:
-                zeroth[piexif.ImageIFD.Copyright] = exif_copyright
-            exif = {"0th": zeroth, "Exif": {}}
-            if exif_description:
-                exif["0th"][piexif.ImageIFD.ImageDescription] = exif_description
-            exif_bytes = piexif.dump(exif)
-        if exif_bytes is not None:
-            rgb.save(jpg_output, format="JPEG", quality=92, optimize=True, subsampling=1, exif=exif_bytes)
-        else:
-            rgb.save(jpg_output, format="JPEG", quality=92, optimize=True, subsampling=1)
-    return output
+
+def _exif_bytes(artist: Optional[str], copyright: Optional[str], description: Optional[str]) -> Optional[bytes]:
+    # Embed EXIF metadata if provided
+    if not any([artist, copyright, description]):
+        return None
+    with _stage("exif.dump"):
+        return _dump_exif(artist, copyright, description)
+
+
+def _dump_exif(artist: Optional[str], copyright: Optional[str], description: Optional[str]) -> bytes:
+    import piexif
+
+    zeroth = {piexif.ImageIFD.Software: "make_banner.py"}
+    if artist:
+        zeroth[piexif.ImageIFD.Artist] = artist
+    if copyright:
+        zeroth[piexif.ImageIFD.Copyright] = copyright
+    exif = {"0th": zeroth, "Exif": {}}
+    if description:
+        exif["0th"][piexif.ImageIFD.ImageDescription] = description
+    return piexif.dump(exif)
+
+
+def theme_path(path: str | Path, theme: str, themes: list[str]) -> str | Path:
+    """Output path for ``theme`` when rendering ``themes`` together.
+
+    A single theme, or the light theme, keeps ``path``; the dark theme of a multi-theme
+    run gets a ``_Dark`` suffix for directories (Exports_Final -> Exports_Final_Dark)
+    and ``_dark`` before the extension for files.
+    """
+    if len(themes) == 1 or theme == "light":
+        return path
+    p = Path(path)
+    if p.suffix:
+        new = p.with_name(f"{p.stem}_{theme}{p.suffix}")
+    else:
+        new = p.with_name(f"{p.name}_{theme.capitalize()}")
+    return str(new) if isinstance(path, str) else new
+
+
+# Preset sizes: (name, width, height, text_shift_ratio)
+PRESETS = {
+    "all_social": [
+        # Instagram
+        ("IG_1080x1080", 1080, 1080, 0.0),
+        ("IG_1080x1350", 1080, 1350, -0.02),
+        ("IG_1080x1920", 1080, 1920, -0.08),  # Stories/Reels: subir um pouco
+        # Facebook
+        ("FacebookPost_1200x1200", 1200, 1200, 0.0),
+        ("FacebookEvent_1200x628", 1200, 628, 0.0),
+        ("FacebookCover_1640x924", 1640, 924, 0.0),
+        # LinkedIn
+        ("LinkedIn_1200x627", 1200, 627, 0.0),
+        ("LinkedInCover_1584x396", 1584, 396, 0.0),
+        # Twitter/X
+        ("Twitter_1600x900", 1600, 900, 0.0),
+        ("TwitterHeader_1500x500", 1500, 500, 0.0),
+        # YouTube
+        ("YouTube_1280x720", 1280, 720, 0.0),
+        ("YouTubeBanner_2560x1440", 2560, 1440, 0.0),
+        ("YouTubeSafe_2048x1152", 2048, 1152, 0.0),
+        # Pinterest
+        ("Pinterest_1000x1500", 1000, 1500, -0.02),
+        ("PinterestSquare_1000x1000", 1000, 1000, 0.0),
+        # TikTok / Stories generic
+        ("TikTok_1080x1920", 1080, 1920, -0.08),
+        # Open Graph generic
+        ("OG_1200x630", 1200, 630, 0.0),
+    ],
+    # Curated formats to ship as final kit
+    "final_kit": [
+        ("Master_4800x2520", 4800, 2520, 0.0),
+        ("Master_2400x1260", 2400, 1260, 0.0),
+        ("IG_1080x1350", 1080, 1350, -0.02),
+        ("IG_1080x1080", 1080, 1080, 0.0),
+        ("IG_1080x1920", 1080, 1920, -0.08),
+        ("LinkedIn_1200x627", 1200, 627, 0.0),
+        ("LinkedInCover_1584x396", 1584, 396, 0.0),
+        ("Twitter_1600x900", 1600, 900, 0.0),
+        ("TwitterHeader_1500x500", 1500, 500, 0.0),
+        ("FacebookPost_1200x1200", 1200, 1200, 0.0),
+        ("FacebookCover_1640x924", 1640, 924, 0.0),
+        ("YouTube_1280x720", 1280, 720, 0.0),
+        ("YouTubeBanner_2560x1440", 2560, 1440, 0.0),
+        ("YouTubeSafe_2048x1152", 2048, 1152, 0.0),
+        ("OG_1200x630", 1200, 630, 0.0),
+    ],
+}
+
+
+MANIFEST_NAME = ".banner_manifest.json"
+_FILE_DIGESTS: dict[Tuple[str, int, int], str] = {}
+
+
+def _file_digest(path: Optional[str]) -> Optional[str]:
+    """sha256 of a file's bytes, memoized per (path, mtime, size)."""
+    if not path or not os.path.isfile(path):
+        return None
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    digest = _FILE_DIGESTS.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b""):
+                h.update(chunk)
+        digest = _FILE_DIGESTS[key] = h.hexdigest()
+    return digest
+
+
+# The generator's code, hashed into render keys so that a code change re-renders
+SOURCE_FILES = ("make_banner.py", "banner_palette.py", "banner_animation.py", "banner_web.py", "banner_batch.py")
+
+
+def _source_digest() -> list[Optional[str]]:
+    here = os.path.dirname(os.path.abspath(__file__))
+    return [_file_digest(os.path.join(here, name)) for name in SOURCE_FILES]
+
+
+def render_key(banner_kwargs: dict) -> str:
+    """Content hash of the inputs of build_banner(**banner_kwargs), excluding output paths."""
+    inputs = {k: v for k, v in banner_kwargs.items() if k not in ("output", "jpg_output")}
+    logo = inputs.pop("logo_path", None)
+    if isinstance(logo, LogoAsset):
+        logo = logo.path
+    inputs["logo"] = _file_digest(logo)
+    registry = get_font_registry()
+    for key in ("title_font_paths", "subtitle_font_paths"):
+        prefs = list(inputs.get(key) or [])
+        inputs[key] = [prefs, _file_digest(registry.resolve(prefs))]
+    inputs["jpg"] = bool(banner_kwargs.get("jpg_output"))
+    inputs["script"] = _source_digest()
+    blob = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    """Per-outdir record of the render key of each output, for incremental builds."""
+
+    VERSION = 1
+
+    def __init__(self, outdir: Path):
+        self.outdir = Path(outdir)
+        self.path = self.outdir / MANIFEST_NAME
+        self.outputs: dict[str, dict] = {}
+        self.zip_key: Optional[str] = None
+        self.changed = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == self.VERSION:
+            self.outputs = data.get("outputs", {})
+            self.zip_key = data.get("zip_key")
+
+    def is_fresh(self, name: str, key: str, files: list[str]) -> bool:
+        entry = self.outputs.get(name)
+        if not entry or entry.get("key") != key or entry.get("files") != files:
+            return False
+        return all((self.outdir / f).is_file() for f in files)
+
+    def record(self, name: str, key: str, files: list[str]) -> None:
+        self.outputs[name] = {"key": key, "files": files}
+        self.changed = True
+
+    def combined_key(self) -> str:
+        blob = json.dumps(self.outputs, sort_keys=True)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": self.VERSION, "outputs": self.outputs, "zip_key": self.zip_key}, fh, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+class PresetZipWriter:
+    """Streams preset outputs (bytes or file paths, in any order) into a zip in a fixed entry order."""
+
+    def __init__(self, archive_path: str | Path, order: list[str]):
+        self.archive_path = str(archive_path)
+        self._tmp_path = self.archive_path + ".part"
+        self._order = order
+        self._next = 0
+        self._ready: dict[str, Tuple[Optional[bytes], Optional[str]]] = {}
+        import zipfile
+
+        self._zip = zipfile.ZipFile(self._tmp_path, "w", compression=zipfile.ZIP_STORED)
+
+    def add(self, arcname: str, data: Optional[bytes] = None, path: Optional[str] = None) -> None:
+        import zipfile
+
+        self._ready[arcname] = (data, path)
+        while self._next < len(self._order) and self._order[self._next] in self._ready:
+            name = self._order[self._next]
+            data, path = self._ready.pop(name)
+            if data is None:
+                self._zip.write(path, arcname=name)
+            else:
+                info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                info.external_attr = 0o644 << 16
+                self._zip.writestr(info, data)
+            self._next += 1
+
+    def close(self) -> str:
+        self._zip.close()
+        if self._next < len(self._order):
+            os.remove(self._tmp_path)
+            raise RuntimeError(f"Zip {self.archive_path} is missing {', '.join(self._order[self._next:])}")
+        os.replace(self._tmp_path, self.archive_path)
+        return self.archive_path
+
+
+def _render_preset_entry(kwargs: dict) -> Tuple[dict[str, list[Tuple[str, Optional[bytes]]]], Optional[dict]]:
+    # Top-level so it can be pickled into worker processes
+    keep_bytes = kwargs.get("_keep_bytes", False)
+    profiler = StageProfiler() if kwargs.get("_profile") else None
+    persist = kwargs.get("_persist", False)
+    kwargs = {k: v for k, v in kwargs.items() if not k.startswith("_")}
+    with profiling(profiler) if profiler else nullcontext(), persistent_caches(persist):
+        with BackgroundWriter(kwargs.get("encoding", "default"), keep_bytes=keep_bytes) as writer:
+            with _stage("build_banner"):
+                build_banner_themes(writer=writer, **kwargs)
+            written = dict(writer.completed(block=True))
+    return written, profiler.report() if profiler else None
+
+
+def render_preset(
+    entries: list[Tuple[str, int, int, float]],
+    outdirs: dict[str, Path],
+    banner_kwargs: dict,
+    text_shift: float = 0.0,
+    jobs: Optional[int] = None,
+    manifests: Optional[dict[str, BuildManifest]] = None,
+    zip_archives: Optional[dict[str, Path]] = None,
+    profile_dir: Optional[Path] = None,
+) -> list[str]:
+    """Render every preset entry as PNG+JPG per theme into ``outdirs[theme]``; return paths in preset order."""
+    common = {k: v for k, v in banner_kwargs.items() if k not in ("output", "jpg_output", "dark_theme")}
+    tasks = []
+    made = []
+    fresh: dict[str, list[str]] = {theme: [] for theme in outdirs}
+    for name, w, h, shift in entries:
+        size = (w, h)
+        shift_ratio = text_shift if text_shift else shift
+        outputs = {}
+        records = {}
+        for theme, outdir in outdirs.items():
+            png_path = outdir / f"{name}.png"
+            jpg_path = outdir / f"{name}.jpg"
+            made.append(str(png_path))
+            made.append(str(jpg_path))
+            if manifests is not None:
+                key = render_key(dict(common, size=size, text_shift_ratio=shift_ratio, dark_theme=theme == "dark", jpg_output=str(jpg_path)))
+                files = [png_path.name, jpg_path.name]
+                if manifests[theme].is_fresh(name, key, files):
+                    print(f"Up to date: {png_path} and {jpg_path}")
+                    fresh[theme] += [str(png_path), str(jpg_path)]
+                    continue
+                # Recorded as soon as the entry is written
+                records[theme] = (name, key, files)
+            outputs[theme] = (str(png_path), str(jpg_path))
+        if outputs:
+            tasks.append(dict(common, outputs=outputs, size=size, text_shift_ratio=shift_ratio, _name=name, _manifest_records=records, _profile=profile_dir is not None))
+
+    zips: dict[str, PresetZipWriter] = {}
+    for theme, archive in (zip_archives or {}).items():
+        manifest = manifests[theme] if manifests is not None else None
+        stale = any(theme in t["outputs"] for t in tasks)
+        if manifest is not None and not stale and manifest.zip_key == manifest.combined_key() and os.path.isfile(archive):
+            print(f"Zip up to date: {archive}")
+            continue
+        order = [Path(p).name for p in made if Path(p).parent == outdirs[theme]]
+        zips[theme] = PresetZipWriter(archive, order)
+        for path in fresh[theme]:
+            zips[theme].add(Path(path).name, path=path)
+
+    def done(kwargs: dict, theme: str, written: list[Tuple[str, Optional[bytes]]]) -> None:
+        print(f"Saved preset: {' and '.join(p for p, _ in written)}")
+        if manifests is not None:
+            manifests[theme].record(*kwargs["_manifest_records"][theme])
+        if theme in zips:
+            for path, data in written:
+                zips[theme].add(Path(path).name, data=data, path=path)
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(tasks)))
+    if jobs == 1:
+        with BackgroundWriter(common.get("encoding", "default"), keep_bytes=bool(zips)) as writer:
+            # The writer completes in submission order: one write per theme of each task
+            submitted: deque[dict] = deque()
+            for kwargs in tasks:
+                profiler = kwargs["_profiler"] = StageProfiler() if profile_dir is not None else None
+                # Encode stages run later on the writer thread but still report to this profiler
+                with profiling(profiler) if profiler else nullcontext(), _stage("build_banner"):
+                    build_banner_themes(writer=writer, **{k: v for k, v in kwargs.items() if not k.startswith("_")})
+                submitted.extend([kwargs] * len(kwargs["outputs"]))
+                for theme, written in writer.completed():
+                    done(submitted.popleft(), theme, written)
+            for theme, written in writer.completed(block=True):
+                done(submitted.popleft(), theme, written)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        scheduled = sorted(tasks, key=lambda t: t["size"][0] * t["size"][1], reverse=True)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # Context variables do not reach the workers: pass the cache mode along
+            persist = _PERSIST_CACHES.get()
+            futures = {pool.submit(_render_preset_entry, dict(kwargs, _keep_bytes=bool(zips), _persist=persist)): kwargs for kwargs in scheduled}
+            for fut in as_completed(futures):
+                written_by_theme, report = fut.result()
+                futures[fut]["_report"] = report
+                for theme, written in written_by_theme.items():
+                    done(futures[fut], theme, written)
+
+    if profile_dir is not None:
+        reports = []
+        for kwargs in tasks:
+            report = kwargs["_profiler"].report() if kwargs.get("_profiler") else kwargs.get("_report") or {}
+            reports.append(report)
+            write_profile(profile_dir / f"{kwargs['_name']}.json", report, name=kwargs["_name"], size=list(kwargs["size"]), themes=list(kwargs["outputs"]))
+        summary = merge_profiles(reports)
+        write_profile(profile_dir / "summary.json", summary, entries=[t["_name"] for t in tasks], jobs=jobs)
+        print(format_profile_table(summary))
+        print(f"Saved stage profiles to {profile_dir}")
+
+    for theme, zw in zips.items():
+        print(f"Zipped preset outputs to {zw.close()}")
+        if manifests is not None:
+            manifests[theme].zip_key = manifests[theme].combined_key()
+            manifests[theme].changed = True
+    return made
+
+
+# Responsive web set (--preset web, banner_web.py): one aspect ratio at several widths, for <picture>/srcset
+WEB_WIDTHS = (480, 768, 1200, 1920, 2400)
+
+
+def parse_themes(value: str) -> list[str]:
+    """Parse a comma-separated --themes value (e.g. "light,dark")."""
+    themes = []
+    for theme in value.split(","):
+        theme = theme.strip().lower()
+        if not theme:
+            continue
+        if theme not in THEMES:
+            raise argparse.ArgumentTypeError(f"unknown theme {theme!r} (choose from {', '.join(THEMES)})")
+        if theme not in themes:
+            themes.append(theme)
+    if not themes:
+        raise argparse.ArgumentTypeError("at least one theme is required")
+    return themes
+
+
+def parse_widths(value: str) -> list[int]:
+    try:
+        widths = [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated integers, got {value!r}")
+    if not widths or min(widths) < 1:
+        raise argparse.ArgumentTypeError("widths must be positive")
+    return widths
 
 
 def parse_args() -> argparse.Namespace:
@@ -344,16 +1880,50 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--subtitle-gap", type=float, default=1.35, help="Gap factor between title and subtitle relative to title height (default=1.35)")
     p.add_argument("--no-upscale-logo", action="store_true", help="Prevent the logo from being upscaled beyond its original size")
     p.add_argument("--text-shift", type=float, default=0.0, help="Vertical shift ratio for the text block (negative moves up). Example: -0.08")
-    p.add_argument("--dark", dest="dark", action="store_true", help="Enable dark theme (darker gradient background)")
+    p.add_argument("--text-shadow", choices=list(TEXT_SHADOWS), default="hard", help="Text shadow: hard (offset black copy, default) or soft (blurred and translucent)")
+    p.add_argument("--dark", dest="dark", action="store_true", help="Enable dark theme (darker gradient background); same as --themes dark")
+    p.add_argument("--themes", type=parse_themes, default=None, help="Comma-separated themes to render in one run, e.g. light,dark. With several themes the dark outputs go to <outdir>_Dark (presets) or <name>_dark.<ext> (single image)")
+    p.add_argument("--quality", choices=list(QUALITY_TIERS), default="standard", help="Background quality tier: draft/standard render the smooth background at reduced resolution and upsample it, max renders at full size (default: standard)")
+    p.add_argument("--bg-engine", choices=list(BG_ENGINES), default="auto", help="Background renderer: numpy (vectorized), pil (original drawing path) or auto (numpy when installed)")
+    p.add_argument("--encoding", choices=list(ENCODING_PROFILES), default="default", help="Encoder profile: default (PNG zlib level 6, optimized JPEG), fast (quick previews) or small (max PNG compression, progressive JPEG)")
     # EXIF metadata for JPG
     p.add_argument("--exif-artist", default=None, help="EXIF Artist field for JPG outputs")
     p.add_argument("--exif-copyright", default=None, help="EXIF Copyright field for JPG outputs")
     p.add_argument("--exif-description", default=None, help="EXIF ImageDescription for JPG outputs")
     # Presets
-    p.add_argument("--preset", choices=["all_social", "final_kit"], default=None, help="Generate a set of social sizes into an output directory")
+    p.add_argument("--preset", choices=list(PRESETS) + ["web"], default=None, help="Generate a set of social sizes into an output directory; web writes a responsive srcset of --width x --height at --web-widths")
+    p.add_argument("--web-widths", type=parse_widths, default=None, help=f"Comma-separated widths for --preset web (default {','.join(map(str, WEB_WIDTHS))})")
+    p.add_argument("--web-formats", type=lambda v: [f.strip().lower() for f in v.split(",") if f.strip()], default=None, help="Comma-separated formats for --preset web, from avif,webp,jpeg (default: all, AVIF only when an encoder is installed)")
+    p.add_argument("--web-sizes", default="100vw", help="sizes attribute of the generated <picture> snippet (default 100vw)")
+    p.add_argument("--web-base-url", default="", help="URL prefix for the files in the <picture> snippet, e.g. assets/banner/")
     p.add_argument("--outdir", default=None, help="Output directory for preset exports (default: ./Exports_<timestamp>)")
-    p.add_argument("--zip", dest="zip_outputs", action="store_true", help="Zip the preset outputs into a single archive")
-    return p.parse_args()
+    p.add_argument("--zip", dest="zip_outputs", action="store_true", help="Zip the preset outputs (or the --preset web set) into a single archive per theme")
+    p.add_argument("--incremental", action="store_true", help="Skip preset or --batch outputs whose inputs are unchanged since the last build (tracked in a manifest inside each output folder)")
+    p.add_argument("--profile", nargs="?", const="", default=None, metavar="DIR", help="Record per-stage wall time and peak image memory; writes a JSON report per output plus a summary (default DIR: <outdir>/_profile for presets, the output's folder otherwise)")
+    p.add_argument("--max-memory-mb", type=int, default=None, help="Peak image-memory ceiling per render in MB; larger sizes are rendered and encoded in horizontal strips through a memory-mapped scratch file (needs --quality draft or standard)")
+    p.add_argument("--jobs", type=int, default=None, help="Worker processes for preset exports (default: CPU count; 1 renders in-process)")
+    p.add_argument("--animate", choices=list(ANIMATION_FORMATS), default=None, help="Export a looping animated banner instead of stills: webp, apng, gif or frames (numbered PNGs); the --output extension is adjusted to the format")
+    p.add_argument("--frames", type=int, default=48, help="Frames per loop for --animate (default 48)")
+    p.add_argument("--fps", type=float, default=12.0, help="Frame rate for --animate (default 12)")
+    p.add_argument("--motion", choices=list(ANIMATION_MOTIONS), default="both", help="Background motion for --animate: drift (moving gradient), highlight (moving radial light) or both (default)")
+    p.add_argument("--palettes", default=None, metavar="DIR", help="Print the gradient colors derived from every logo image under DIR (recursively) and exit; results are cached by file content, --jobs sets the worker processes")
+    p.add_argument("--palettes-json", default=None, metavar="FILE", help="With --palettes, also write the results as JSON")
+    p.add_argument("--watch", action="store_true", help="Keep running and re-render when the logo, a font or the --batch file changes: low-res proxies are written to _proxy/ first, then the changed outputs at full size (works with --batch, --preset and single images)")
+    p.add_argument("--batch", default=None, metavar="FILE", help="Render a matrix of jobs from a JSON/JSONL job file, computing each shared background, text layout and logo layer once; the other options act as defaults for every job")
+    args = p.parse_args()
+    if args.dark and args.themes:
+        p.error("--dark cannot be combined with --themes (use --themes dark or --themes light,dark)")
+    if args.preset == "web" and args.jpg is not None:
+        p.error("--jpg does not apply to --preset web; choose its encodings with --web-formats")
+    if args.preset == "web" and args.max_memory_mb is not None:
+        # The set is downscaled from one full canvas per theme, so there is no strip path
+        p.error("--max-memory-mb is not supported with --preset web")
+    if args.batch or args.watch:
+        # The batch planner shares intermediates within one process and renders full frames
+        for flag, value in (("--jobs", args.jobs), ("--max-memory-mb", args.max_memory_mb)):
+            if value is not None:
+                p.error(f"{flag} is not supported with {'--batch' if args.batch else '--watch'}")
+    return args
 
 
 def main():
@@ -364,146 +1934,220 @@ def main():
         base, _ = os.path.splitext(args.output)
         jpg_path = base + ".jpg"
 
-    if args.preset == "all_social":
-        # Define common social sizes (name, width, height)
-        # (name, width, height, text_shift_ratio)
-        sizes = [
-            # Instagram
-            ("IG_1080x1080", 1080, 1080, 0.0),
-            ("IG_1080x1350", 1080, 1350, -0.02),
-            ("IG_1080x1920", 1080, 1920, -0.08),  # Stories/Reels: subir um pouco
-            # Facebook
-            ("FacebookPost_1200x1200", 1200, 1200, 0.0),
-            ("FacebookEvent_1200x628", 1200, 628, 0.0),
-            ("FacebookCover_1640x924", 1640, 924, 0.0),
-            # LinkedIn
-            ("LinkedIn_1200x627", 1200, 627, 0.0),
-            ("LinkedInCover_1584x396", 1584, 396, 0.0),
-            # Twitter/X
-            ("Twitter_1600x900", 1600, 900, 0.0),
-            ("TwitterHeader_1500x500", 1500, 500, 0.0),
-            # YouTube
-            ("YouTube_1280x720", 1280, 720, 0.0),
-            ("YouTubeBanner_2560x1440", 2560, 1440, 0.0),
-            ("YouTubeSafe_2048x1152", 2048, 1152, 0.0),
-            # Pinterest
-            ("Pinterest_1000x1500", 1000, 1500, -0.02),
-            ("PinterestSquare_1000x1000", 1000, 1000, 0.0),
-            # TikTok / Stories generic
-            ("TikTok_1080x1920", 1080, 1920, -0.08),
-            # Open Graph generic
-            ("OG_1200x630", 1200, 630, 0.0),
-        ]
-        outdir = Path(args.outdir) if args.outdir else Path.cwd() / f"Exports_{int(__import__('time').time())}"
-        outdir.mkdir(parents=True, exist_ok=True)
-
-        made = []
-        for name, w, h, shift in sizes:
-            png_path = outdir / f"{name}.png"
-            jpg_path2 = outdir / f"{name}.jpg"
-            outp = build_banner(
-                title=args.title,
-                subtitle=args.subtitle,
-                logo_path=args.logo,
-                output=str(png_path),
-                size=(w, h),
-                margin=args.margin,
-                title_font_paths=args.title_font,
-                subtitle_font_paths=args.subtitle_font,
-                palette_from_logo=not args.__dict__.get("no_palette_from_logo", False),
-                jpg_output=str(jpg_path2),
-                logo_scale=args.logo_scale,
-                subtitle_gap_factor=args.subtitle_gap,
-                allow_upscale_logo=not args.__dict__.get("no_upscale_logo", False),
-                text_shift_ratio=args.text_shift if args.text_shift else shift,
-                dark_theme=args.dark,
-                exif_artist=args.exif_artist,
-                exif_copyright=args.exif_copyright,
-                exif_description=args.exif_description,
-            )
-            print(f"Saved preset: {outp} and {jpg_path2}")
-            made.append(str(png_path))
-            made.append(str(jpg_path2))
-
-        if args.zip_outputs:
-            zip_base = outdir.with_suffix("")
-            archive_path = shutil.make_archive(str(zip_base), "zip", root_dir=str(outdir))
-            print(f"Zipped preset outputs to {archive_path}")
-        return
-
-    if args.preset == "final_kit":
-        # Curated formats to ship as final kit
-        sizes = [
-            ("Master_4800x2520", 4800, 2520, 0.0),
-            ("Master_2400x1260", 2400, 1260, 0.0),
-            ("IG_1080x1350", 1080, 1350, -0.02),
-            ("IG_1080x1080", 1080, 1080, 0.0),
-            ("IG_1080x1920", 1080, 1920, -0.08),
-            ("LinkedIn_1200x627", 1200, 627, 0.0),
-            ("LinkedInCover_1584x396", 1584, 396, 0.0),
-            ("Twitter_1600x900", 1600, 900, 0.0),
-            ("TwitterHeader_1500x500", 1500, 500, 0.0),
-            ("FacebookPost_1200x1200", 1200, 1200, 0.0),
-            ("FacebookCover_1640x924", 1640, 924, 0.0),
-            ("YouTube_1280x720", 1280, 720, 0.0),
-            ("YouTubeBanner_2560x1440", 2560, 1440, 0.0),
-            ("YouTubeSafe_2048x1152", 2048, 1152, 0.0),
-            ("OG_1200x630", 1200, 630, 0.0),
-        ]
-        outdir = Path(args.outdir) if args.outdir else Path.cwd() / "Exports_Final"
-        outdir.mkdir(parents=True, exist_ok=True)
-
-        for name, w, h, shift in sizes:
-            png_path = outdir / f"{name}.png"
-            jpg_path2 = outdir / f"{name}.jpg"
-            outp = build_banner(
-                title=args.title,
-                subtitle=args.subtitle,
-                logo_path=args.logo,
-                output=str(png_path),
-                size=(w, h),
-                margin=args.margin,
-                title_font_paths=args.title_font,
-                subtitle_font_paths=args.subtitle_font,
-                palette_from_logo=not args.__dict__.get("no_palette_from_logo", False),
-                jpg_output=str(jpg_path2),
-                logo_scale=args.logo_scale,
-                subtitle_gap_factor=args.subtitle_gap,
-                allow_upscale_logo=not args.__dict__.get("no_upscale_logo", False),
-                text_shift_ratio=args.text_shift if args.text_shift else shift,
-            )
-            print(f"Saved preset: {outp} and {jpg_path2}")
-
-        if args.zip_outputs:
-            archive_path = shutil.make_archive(str(outdir), "zip", root_dir=str(outdir))
-            print(f"Zipped preset outputs to {archive_path}")
+    themes = args.themes or (["dark"] if args.dark else ["light"])
+
+    if args.palettes:
+        from banner_palette import extract_palettes, find_logo_files, get_palette_cache
+
+        files = find_logo_files(args.palettes)
+        t0 = time.perf_counter()
+        cached = sum(1 for path in files if _file_digest(path) in get_palette_cache())
+        pairs = extract_palettes(files, jobs=args.jobs)
+        report = {}
+        for path, pair in pairs.items():
+            rel = os.path.relpath(path, args.palettes)
+            report[rel] = {"start": "#%02x%02x%02x" % pair[0], "end": "#%02x%02x%02x" % pair[1]} if pair else None
+            print(f"{rel}\t{report[rel]['start']}\t{report[rel]['end']}" if pair else f"{rel}\t-\t-")
+        if args.palettes_json:
+            with open(args.palettes_json, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2, sort_keys=True)
+                fh.write("\n")
+        print(f"Palettes: {len(files)} logos ({cached} cached) in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
         return
 
-    # Single image path (default behavior)
-    out = build_banner(
+    banner_kwargs = dict(
         title=args.title,
         subtitle=args.subtitle,
         logo_path=args.logo,
-        output=args.output,
-        size=(args.width, args.height),
         margin=args.margin,
         title_font_paths=args.title_font,
         subtitle_font_paths=args.subtitle_font,
         palette_from_logo=not args.__dict__.get("no_palette_from_logo", False),
-        jpg_output=jpg_path,
         logo_scale=args.logo_scale,
         subtitle_gap_factor=args.subtitle_gap,
         allow_upscale_logo=not args.__dict__.get("no_upscale_logo", False),
-        text_shift_ratio=args.text_shift,
-        dark_theme=args.dark,
+        text_shadow=args.text_shadow,
         exif_artist=args.exif_artist,
         exif_copyright=args.exif_copyright,
         exif_description=args.exif_description,
+        bg_engine=args.bg_engine,
+        quality=args.quality,
+        encoding=args.encoding,
+        max_memory=args.max_memory_mb << 20 if args.max_memory_mb else None,
     )
-    print(f"Saved banner to {out}")
-    if jpg_path:
-        print(f"Saved JPG to {jpg_path}")
+
+    if args.batch or args.watch:
+        from banner_batch import expand_batch, load_batch_file, plan_batch, run_batch, run_batch_incremental, watch_batch
+
+        defaults = dict(
+            title=args.title,
+            subtitle=args.subtitle,
+            logo=args.logo,
+            margin=args.margin,
+            title_font=args.title_font,
+            subtitle_font=args.subtitle_font,
+            palette_from_logo=banner_kwargs["palette_from_logo"],
+            logo_scale=args.logo_scale,
+            subtitle_gap=args.subtitle_gap,
+            allow_upscale_logo=banner_kwargs["allow_upscale_logo"],
+            text_shift=args.text_shift,
+            text_shadow=args.text_shadow,
+            exif_artist=args.exif_artist,
+            exif_copyright=args.exif_copyright,
+            exif_description=args.exif_description,
+            quality=args.quality,
+            bg_engine=args.bg_engine,
+            preset=args.preset,
+            themes=themes,
+        )
+        if args.outdir:
+            defaults["outdir"] = args.outdir
+        if args.watch:
+            if args.preset == "web":
+                raise SystemExit("--watch does not support --preset web")
+            if not args.batch and not args.preset:
+                # Single image: one job named after --output, in its folder
+                output = Path(args.output).resolve()
+                defaults.update(size=[args.width, args.height], name=output.stem, outdir=args.outdir or str(output.parent), jpg=jpg_path is not None)
+            elif args.preset == "final_kit" and not args.outdir:
+                defaults["outdir"] = "Exports_Final"
+            load_jobs = partial(load_batch_file, args.batch, defaults) if args.batch else partial(expand_batch, {}, defaults)
+            watch_batch(load_jobs, config_path=args.batch, encoding=args.encoding)
+            return
+        plan = plan_batch(load_batch_file(args.batch, defaults))
+        profiler = StageProfiler() if args.profile is not None else None
+        with profiling(profiler) if profiler else nullcontext():
+            if args.incremental:
+                run_batch_incremental(plan, encoding=args.encoding)
+            else:
+                run_batch(plan, encoding=args.encoding)
+        if profiler is not None:
+            profile_dir = Path(args.profile) if args.profile else Path.cwd()
+            report_path = profile_dir / f"{Path(args.batch).stem}.profile.json"
+            write_profile(report_path, profiler.report(), batch=str(args.batch), outputs=len(plan.outputs))
+            print(format_profile_table(profiler.report()))
+            print(f"Saved stage profile to {report_path}")
+        return
+
+    if args.preset == "web":
+        from banner_web import render_web_set
+
+        outdir = Path(args.outdir) if args.outdir else Path.cwd() / "Exports_Web"
+        outdirs = {theme: theme_path(outdir, theme, themes) for theme in themes}
+        profiler = StageProfiler() if args.profile is not None else None
+        with profiling(profiler) if profiler else nullcontext():
+            render_web_set(
+                outdirs,
+                Path(args.output).stem,
+                banner_kwargs,
+                aspect=(args.width, args.height),
+                widths=args.web_widths,
+                formats=args.web_formats,
+                text_shift=args.text_shift,
+                sizes=args.web_sizes,
+                base_url=args.web_base_url,
+                jobs=args.jobs,
+                incremental=args.incremental,
+                zip_archives={theme: str(d.with_suffix("")) + ".zip" for theme, d in outdirs.items()} if args.zip_outputs else None,
+            )
+        if profiler is not None:
+            profile_dir = Path(args.profile) if args.profile else outdir / "_profile"
+            report_path = profile_dir / f"{Path(args.output).stem}.web.profile.json"
+            write_profile(report_path, profiler.report(), name=Path(args.output).stem, aspect=[args.width, args.height], themes=themes)
+            print(format_profile_table(profiler.report()))
+            print(f"Saved stage profile to {report_path}")
+        return
+
+    if args.preset:
+        if args.outdir:
+            outdir = Path(args.outdir)
+        elif args.preset == "final_kit":
+            outdir = Path.cwd() / "Exports_Final"
+        else:
+            outdir = Path.cwd() / f"Exports_{int(time.time())}"
+        outdirs = {theme: theme_path(outdir, theme, themes) for theme in themes}
+        for d in outdirs.values():
+            d.mkdir(parents=True, exist_ok=True)
+
+        manifests = {theme: BuildManifest(d) for theme, d in outdirs.items()} if args.incremental else None
+        zip_archives = {theme: str(d.with_suffix("")) + ".zip" for theme, d in outdirs.items()} if args.zip_outputs else None
+        try:
+            profile_dir = None
+            if args.profile is not None:
+                profile_dir = Path(args.profile) if args.profile else outdir / "_profile"
+            render_preset(PRESETS[args.preset], outdirs, banner_kwargs, text_shift=args.text_shift, jobs=args.jobs, manifests=manifests, zip_archives=zip_archives, profile_dir=profile_dir)
+        finally:
+            for manifest in (manifests or {}).values():
+                if manifest.changed:
+                    manifest.save()
+        return
+
+    if args.animate:
+        from banner_animation import animation_path, build_animated_banner
+
+        profiler = StageProfiler() if args.profile is not None else None
+        with profiling(profiler) if profiler else nullcontext():
+            for theme in themes:
+                out = build_animated_banner(
+                    animation_path(str(theme_path(args.output, theme, themes)), args.animate),
+                    args.title,
+                    args.subtitle,
+                    logo_path=args.logo,
+                    size=(args.width, args.height),
+                    fmt=args.animate,
+                    frames=args.frames,
+                    fps=args.fps,
+                    motion=args.motion,
+                    theme=theme,
+                    margin=args.margin,
+                    title_font_paths=args.title_font,
+                    subtitle_font_paths=args.subtitle_font,
+                    palette_from_logo=banner_kwargs["palette_from_logo"],
+                    logo_scale=args.logo_scale,
+                    subtitle_gap_factor=args.subtitle_gap,
+                    allow_upscale_logo=banner_kwargs["allow_upscale_logo"],
+                    text_shift_ratio=args.text_shift,
+                    text_shadow=args.text_shadow,
+                    bg_engine=args.bg_engine,
+                    quality=args.quality,
+                    encoding=args.encoding,
+                )
+                print(f"Saved animated banner to {out}")
+        if profiler is not None:
+            profile_dir = Path(args.profile) if args.profile else Path(args.output).resolve().parent
+            report_path = profile_dir / f"{Path(args.output).stem}.profile.json"
+            write_profile(report_path, profiler.report(), name=Path(args.output).stem, size=[args.width, args.height], themes=themes, animate=args.animate, frames=args.frames)
+            print(format_profile_table(profiler.report()))
+            print(f"Saved stage profile to {report_path}")
+        return
+
+    # Single image path (default behavior)
+    outputs = {
+        theme: (theme_path(args.output, theme, themes), theme_path(jpg_path, theme, themes) if jpg_path else None)
+        for theme in themes
+    }
+    profiler = StageProfiler() if args.profile is not None else None
+    with profiling(profiler) if profiler else nullcontext(), _stage("build_banner"):
+        saved = build_banner_themes(
+            outputs,
+            size=(args.width, args.height),
+            text_shift_ratio=args.text_shift,
+            **banner_kwargs,
+        )
+    for theme, out in saved.items():
+        print(f"Saved banner to {out}")
+        if outputs[theme][1]:
+            print(f"Saved JPG to {outputs[theme][1]}")
+    if profiler is not None:
+        profile_dir = Path(args.profile) if args.profile else Path(args.output).resolve().parent
+        report_path = profile_dir / f"{Path(args.output).stem}.profile.json"
+        write_profile(report_path, profiler.report(), name=Path(args.output).stem, size=[args.width, args.height], themes=themes)
+        print(format_profile_table(profiler.report()))
+        print(f"Saved stage profile to {report_path}")
 
 
 if __name__ == "__main__":
-    main()
+    # The sibling modules import make_banner: let them share this module's state
+    sys.modules.setdefault("make_banner", sys.modules[__name__])
+    with persistent_caches():
+        main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Local OG-image render server for Conecta Libras (built on make_banner.py)
+
+Renders share images on demand from query parameters, e.g.:
+  http://127.0.0.1:8765/banner.png?title=Conecta%20Libras&subtitle=Inclusive%20communication&theme=dark
+  http://127.0.0.1:8765/banner.webp?size=1080x1080&subtitle=Comunicaci%C3%B3n%20inclusiva
+
+Query parameters: title, subtitle, size (WxH) or w/h, theme (light|dark).
+The extension picks the format: .png, .jpg/.jpeg or .webp.
+
+- Renders run in a pool of worker processes that keep fonts, the logo and its
+  palette warm; at most --workers render at once and at most --max-pending wait,
+  beyond that the server answers 503 with Retry-After.
+- Identical concurrent requests share one render.
+- Encoded images are kept in an LRU bounded by --cache-mb and served with a
+  strong ETag; If-None-Match answers 304 without rendering.
+
+Usage examples:
+  python tools/banner/render_server.py --logo assets/logo/wss_studio_art_logo.png
+  python tools/banner/render_server.py --port 9000 --workers 4 --cache-mb 256 --exif-artist "WSS Studio Art"
+
+GET /healthz returns cache and queue statistics as JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE))
+
+import make_banner as mb  # noqa: E402
+
+
+DEFAULT_PORT = 8765
+MAX_DIMENSION = 4096  # per side; larger sizes belong to the presets
+MAX_TEXT_LENGTH = 200
+CACHE_MAX_AGE = 86400  # seconds, for Cache-Control
+ROUTES = {"/banner.png": "png", "/banner.jpg": "jpeg", "/banner.jpeg": "jpeg", "/banner.webp": "webp"}
+
+
+class Overloaded(Exception):
+    """Raised when the render queue is full."""
+
+
+class ResponseCache:
+    """Thread-safe LRU of encoded images, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, count: bool = True) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += count
+                return None
+            self._entries.move_to_end(key)
+            self.hits += count
+            return entry
+
+    def put(self, key, etag: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old[1])
+            self._entries[key] = (etag, data)
+            self.nbytes += len(data)
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.nbytes, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+
+def _warm_worker(logo_path: Optional[str], font_paths: Tuple[str, ...]) -> None:
+    # Populate the per-process caches before the first request arrives
+    registry = mb.get_font_registry()
+    registry.resolve(list(font_paths))
+    if logo_path:
+        asset = mb.get_logo_asset(logo_path)
+        if asset:
+            asset.palette()
+
+
+def _render(request: mb.BannerRequest) -> bytes:
+    (fmt,) = request.formats
+    return mb.render_banner(request).images[fmt]
+
+
+def etag_for(data: bytes) -> str:
+    return '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+
+
+class RenderService:
+    """Renders BannerRequests in worker processes, behind the response cache."""
+
+    def __init__(self, logo_path: Optional[str] = None, font_paths: Tuple[str, ...] = (), workers: Optional[int] = None, max_pending: Optional[int] = None, cache_bytes: int = 128 << 20):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending if max_pending is not None else 8 * self.workers
+        self.cache = ResponseCache(cache_bytes)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker, initargs=(logo_path, tuple(font_paths)))
+        self._inflight: dict = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.rejected = 0
+
+    def cached(self, request: mb.BannerRequest) -> Optional[Tuple[str, bytes]]:
+        return self.cache.get(request)
+
+    def render(self, request: mb.BannerRequest) -> Tuple[str, bytes]:
+        """(etag, encoded bytes) for ``request`` after a cache miss; joins a render already in flight."""
+        submitted = False
+        with self._lock:
+            future = self._inflight.get(request)
+            if future is None:
+                # Finished renders are cached before they leave _inflight
+                hit = self.cache.get(request, count=False)
+                if hit is not None:
+                    return hit
+                if len(self._inflight) >= self.max_pending:
+                    self.rejected += 1
+                    raise Overloaded()
+                future = self._pool.submit(_render, request)
+                self._inflight[request] = future
+                self.renders += 1
+                submitted = True
+        if submitted:
+            # Outside the lock: a future that is already done runs the callback
+            # right here, and _finish takes the lock
+            future.add_done_callback(lambda f, request=request: self._finish(request, f))
+        data = future.result()
+        return etag_for(data), data
+
+    def _finish(self, request: mb.BannerRequest, future: Future) -> None:
+        if future.exception() is None:
+            data = future.result()
+            self.cache.put(request, etag_for(data), data)
+        with self._lock:
+            self._inflight.pop(request, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._inflight)
+        return {"workers": self.workers, "pending": pending, "max_pending": self.max_pending, "renders": self.renders, "rejected": self.rejected, "cache": self.cache.stats()}
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    w, sep, h = value.lower().partition("x")
+    if not sep:
+        raise ValueError(f"invalid size {value!r} (expected WxH)")
+    return int(w), int(h)
+
+
+def request_from_query(query: str, fmt: str, defaults: mb.BannerRequest) -> mb.BannerRequest:
+    """Build a BannerRequest from URL query parameters; raises ValueError on bad input."""
+    params = {k: v[-1] for k, v in parse_qs(query, keep_blank_values=True).items()}
+    title = params.get("title", defaults.title)
+    subtitle = params.get("subtitle", defaults.subtitle)
+    if len(title) > MAX_TEXT_LENGTH or len(subtitle) > MAX_TEXT_LENGTH:
+        raise ValueError(f"title and subtitle are limited to {MAX_TEXT_LENGTH} characters")
+    if "size" in params:
+        size = parse_size(params["size"])
+    else:
+        size = (int(params.get("w", defaults.size[0])), int(params.get("h", defaults.size[1])))
+    if not all(16 <= side <= MAX_DIMENSION for side in size):
+        raise ValueError(f"size must be between 16 and {MAX_DIMENSION} px per side")
+    theme = params.get("theme", defaults.theme)
+    if theme not in mb.THEMES:
+        raise ValueError(f"unknown theme {theme!r} (expected one of {', '.join(mb.THEMES)})")
+    return defaults._replace(title=title, subtitle=subtitle, size=size, theme=theme, formats=(fmt,))
+
+
+class BannerHandler(BaseHTTPRequestHandler):
+    server_version = "ConectaLibrasBanner/1.0"
+    service: RenderService
+    defaults: mb.BannerRequest
+
+    def do_GET(self):
+        self._handle(send_body=True)
+
+    def do_HEAD(self):
+        self._handle(send_body=False)
+
+    def _handle(self, send_body: bool) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/healthz":
+            self._send(HTTPStatus.OK, json.dumps(self.service.stats()).encode("utf-8"), "application/json", send_body=send_body)
+            return
+        fmt = ROUTES.get(url.path)
+        if fmt is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "unknown path", send_body)
+            return
+        try:
+            request = request_from_query(url.query, fmt, self.defaults)
+        except ValueError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e), send_body)
+            return
+
+        # Revalidation straight from the cache, without rendering
+        if_none_match = self.headers.get("If-None-Match")
+        hit = self.service.cached(request)
+        if hit is not None and if_none_match and _etag_matches(if_none_match, hit[0]):
+            self._send_not_modified(hit[0])
+            return
+        try:
+            etag, data = hit if hit is not None else self.service.render(request)
+        except Overloaded:
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, "render queue full", send_body, extra={"Retry-After": "1"})
+            return
+        except Exception as e:  # render failure
+            self.log_error("render failed for %r: %s", request, e)
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "render failed", send_body)
+            return
+        if if_none_match and _etag_matches(if_none_match, etag):
+            self._send_not_modified(etag)
+            return
+        self._send(HTTPStatus.OK, data, mb.RenderedBanner.mime_type(fmt), send_body=send_body, extra=_cache_headers(etag))
+
+    def _send(self, status: HTTPStatus, body: bytes, content_type: str, send_body: bool = True, extra: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str, send_body: bool, extra: Optional[dict] = None) -> None:
+        self._send(status, (message + "\n").encode("utf-8"), "text/plain; charset=utf-8", send_body=send_body, extra=extra)
+
+    def _send_not_modified(self, etag: str) -> None:
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        for name, value in _cache_headers(etag).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+
+def _cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": f"public, max-age={CACHE_MAX_AGE}"}
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def make_server(host: str, port: int, service: RenderService, defaults: mb.BannerRequest) -> ThreadingHTTPServer:
+    handler = type("Handler", (BannerHandler,), {"service": service, "defaults": defaults})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Serve Conecta Libras banners rendered on demand")
+    p.add_argument("--host", default="127.0.0.1", help="Bind address (default 127.0.0.1)")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default {DEFAULT_PORT})")
+    p.add_argument("--logo", default=None, help="Logo image used for every banner")
+    p.add_argument("--title", default="Conecta Libras", help="Default title")
+    p.add_argument("--subtitle", default="Comunicação inclusiva sem barreiras", help="Default subtitle")
+    p.add_argument("--title-font", action="append", default=[], help="Title font path; can be repeated")
+    p.add_argument("--subtitle-font", action="append", default=[], help="Subtitle font path; can be repeated")
+    p.add_argument("--logo-scale", type=float, default=1.0, help="Scale factor for logo width")
+    p.add_argument("--quality", choices=list(mb.QUALITY_TIERS), default="standard", help="Background quality tier")
+    p.add_argument("--encoding", choices=list(mb.ENCODING_PROFILES), default="default", help="Encoder profile")
+    p.add_argument("--exif-artist", default=None, help="EXIF Artist for JPEG/WebP responses")
+    p.add_argument("--exif-copyright", default=None, help="EXIF Copyright for JPEG/WebP responses")
+    p.add_argument("--workers", type=int, default=None, help="Concurrent renders (default: CPU count)")
+    p.add_argument("--max-pending", type=int, default=None, help="Renders allowed in flight before answering 503 (default: 8 x workers)")
+    p.add_argument("--cache-mb", type=int, default=128, help="Response cache size in MB (default 128)")
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.logo and not os.path.isfile(args.logo):
+        print(f"Logo not found: {args.logo}", file=sys.stderr)
+        return 2
+    logo = os.path.abspath(args.logo) if args.logo else None
+    defaults = mb.BannerRequest(
+        title=args.title,
+        subtitle=args.subtitle,
+        logo_path=logo,
+        title_font_paths=tuple(args.title_font),
+        subtitle_font_paths=tuple(args.subtitle_font),
+        logo_scale=args.logo_scale,
+        exif_artist=args.exif_artist,
+        exif_copyright=args.exif_copyright,
+        quality=args.quality,
+        encoding=args.encoding,
+    )
+    service = RenderService(
+        logo_path=logo,
+        font_paths=tuple(args.title_font) + tuple(args.subtitle_font),
+        workers=args.workers,
+        max_pending=args.max_pending,
+        cache_bytes=args.cache_mb << 20,
+    )
+    server = make_server(args.host, args.port, service, defaults)
+    print(f"Serving banners on http://{args.host}:{server.server_port}/banner.png ({service.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
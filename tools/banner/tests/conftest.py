@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path, monkeypatch):
+    # Keep the font index, palettes and logo variants of a test run away from the user's cache
+    import banner_palette
+    import make_banner as mb
+
+    monkeypatch.setenv("BANNER_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(banner_palette, "_PALETTE_CACHE", None)
+    monkeypatch.setattr(mb, "_FONT_REGISTRY", None)
+    mb._LOGO_ASSETS.clear()
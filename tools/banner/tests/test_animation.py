@@ -0,0 +1,72 @@
+import os
+
+import pytest
+from PIL import Image, ImageSequence, features
+
+import banner_animation
+
+SIZE = (48, 24)
+COLORS = [(220, 40, 40), (40, 200, 60), (30, 60, 230)]
+
+
+def frames():
+    return [Image.new("RGB", SIZE, color) for color in COLORS]
+
+
+def close_to(pixel, color, tolerance):
+    return all(abs(a - b) <= tolerance for a, b in zip(pixel[:3], color))
+
+
+@pytest.mark.parametrize("fmt, tolerance", [("webp", 12), ("apng", 0), ("gif", 8)])
+def test_writer_output_decodes_with_pillow(tmp_path, fmt, tolerance):
+    if fmt == "webp" and not features.check("webp_anim"):
+        pytest.skip("Pillow built without animated WebP")
+    path = banner_animation.animation_path(str(tmp_path / "anim"), fmt)
+    with banner_animation.AnimationWriter(path, fmt, SIZE, len(COLORS), fps=10) as writer:
+        for frame in frames():
+            writer.add(frame)
+    assert not os.path.exists(path + ".part")
+
+    with Image.open(path) as im:
+        assert im.size == SIZE
+        assert im.n_frames == len(COLORS)
+        assert im.info.get("loop") == 0
+        decoded = [(f.convert("RGB").getpixel((SIZE[0] // 2, SIZE[1] // 2)), f.info.get("duration")) for f in ImageSequence.Iterator(im)]
+    for (pixel, duration), color in zip(decoded, COLORS):
+        assert close_to(pixel, color, tolerance), (pixel, color)
+        assert duration == 100
+
+
+def test_frames_format_writes_numbered_pngs(tmp_path):
+    path = str(tmp_path / "seq")
+    with banner_animation.AnimationWriter(path, "frames", SIZE, len(COLORS)) as writer:
+        for frame in frames():
+            writer.add(frame)
+    assert sorted(os.listdir(path)) == ["frame_0001.png", "frame_0002.png", "frame_0003.png"]
+
+
+@pytest.mark.parametrize("fmt", ["webp", "apng", "gif"])
+def test_failed_frame_leaves_no_partial_file(tmp_path, fmt):
+    path = str(tmp_path / f"anim.{fmt}")
+    with pytest.raises(ValueError, match="does not match"):
+        with banner_animation.AnimationWriter(path, fmt, SIZE, 2) as writer:
+            writer.add(frames()[0])
+            writer.add(Image.new("RGB", (8, 8)))
+    assert os.listdir(tmp_path) == []
+    assert writer._fh.closed
+
+
+def test_apng_with_missing_frames_is_rejected(tmp_path):
+    path = str(tmp_path / "anim.png")
+    with pytest.raises(RuntimeError, match="expected 3 frames"):
+        with banner_animation.AnimationWriter(path, "apng", SIZE, 3) as writer:
+            writer.add(frames()[0])
+    assert os.listdir(tmp_path) == []
+
+
+def test_animated_banner_end_to_end(tmp_path):
+    path = banner_animation.build_animated_banner(str(tmp_path / "banner.gif"), "Conecta", "Libras", size=(96, 48), fmt="gif", frames=4, fps=8)
+    assert path == str(tmp_path / "banner.gif")
+    with Image.open(path) as im:
+        assert im.size == (96, 48)
+        assert im.n_frames == 4
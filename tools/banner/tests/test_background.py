@@ -0,0 +1,29 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import make_banner as mb
+
+COLORS = [((34, 110, 255), (136, 58, 255)), ((36, 38, 53), (146, 165, 161)), ((255, 255, 255), (0, 0, 0))]
+
+
+@pytest.mark.parametrize("size", [(2, 1), (1, 2), (16, 16), (33, 7), (101, 55), (1200, 630)])
+@pytest.mark.parametrize("colors", COLORS)
+@pytest.mark.parametrize("dark", [False, True])
+def test_numpy_engine_matches_pil_within_one_level(size, colors, dark):
+    start, end = colors
+    pil = mb.make_linear_gradient(size, start, end, dark=dark, engine="pil", quality="max")
+    fast = mb.make_linear_gradient(size, start, end, dark=dark, engine="numpy", quality="max")
+    assert fast.size == pil.size == size
+    assert fast.mode == pil.mode
+    diff = np.abs(np.asarray(fast, dtype=np.int16) - np.asarray(pil, dtype=np.int16))
+    assert diff.max() <= 1
+
+
+@pytest.mark.parametrize("quality", ["draft", "standard"])
+def test_engines_agree_at_reduced_quality(quality):
+    start, end = COLORS[0]
+    pil = mb.make_linear_gradient((640, 336), start, end, engine="pil", quality=quality)
+    fast = mb.make_linear_gradient((640, 336), start, end, engine="numpy", quality=quality)
+    diff = np.abs(np.asarray(fast, dtype=np.int16) - np.asarray(pil, dtype=np.int16))
+    assert diff.max() <= 1
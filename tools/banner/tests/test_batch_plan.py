@@ -0,0 +1,98 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import banner_batch
+
+LOGO = str(Path(__file__).resolve().parents[3] / "assets" / "logo" / "wss_studio_art_logo.png")
+
+
+def plan(spec, **defaults):
+    return banner_batch.plan_batch(banner_batch.expand_batch(spec, dict({"palette_from_logo": False, "jpg": False}, **defaults)))
+
+
+def test_matrix_expands_jobs_by_axes():
+    jobs = banner_batch.expand_batch({"defaults": {"title": "T"}, "jobs": [{"name": "a"}, {"name": "b"}], "matrix": {"theme": ["light", "dark"]}})
+    assert [(job["name"], job["theme"], job["title"]) for job in jobs] == [("a", "light", "T"), ("a", "dark", "T"), ("b", "light", "T"), ("b", "dark", "T")]
+
+
+def test_shared_intermediates_are_planned_once(tmp_path):
+    p = plan(
+        {"jobs": [{"lang": "pt", "subtitle": "Comunicação"}, {"lang": "en", "subtitle": "Communication"}], "matrix": {"theme": ["light", "dark"]}},
+        sizes=[["A", 640, 320], ["B", 1280, 640]],
+        logo=LOGO,
+        logo_scale=0.5,
+        outdir=str(tmp_path / "{lang}" / "{theme}"),
+    )
+    assert len(p.outputs) == 8
+    # Backgrounds and logo layers depend on the size only; texts also on the subtitle
+    assert p.counts() == {"background": 2, "dark": 2, "text": 4, "logo": 2}
+
+
+def test_identical_intermediates_dedup_across_jobs(tmp_path):
+    p = plan({"jobs": [{"name": "one"}, {"name": "two"}]}, size=[64, 32], outdir=str(tmp_path))
+    assert len(p.outputs) == 2
+    assert p.outputs[0].background == p.outputs[1].background
+    assert p.outputs[0].text == p.outputs[1].text
+    assert p.counts() == {"background": 1, "text": 1}
+
+
+def test_ordered_groups_outputs_by_background(tmp_path):
+    p = plan(
+        {"jobs": [{"size": [64, 32], "name": "s1"}, {"size": [96, 48], "name": "s2"}, {"size": [64, 32], "name": "s3"}]},
+        themes=["dark", "light"],
+        outdir=str(tmp_path),
+    )
+    ordered = p.ordered()
+    lights = [out.background[1] if out.background[0] == "dark" else out.background for out in ordered]
+    # Each background is used in one run, light before the dark derived from it
+    assert lights == sorted(lights, key=lights.index)
+    assert [Path(out.png).stem for out in ordered] == ["s1", "s3", "s1", "s3", "s2", "s2"]
+    assert [out.background[0] for out in ordered] == ["background", "background", "dark", "dark", "background", "dark"]
+
+
+def test_output_naming(tmp_path):
+    p = plan(
+        {"jobs": [{"lang": "pt"}]},
+        size=[64, 32],
+        name="banner_{lang}",
+        themes=["light", "dark"],
+        outdir=str(tmp_path / "out"),
+        jpg=True,
+    )
+    assert [(out.png, out.jpg) for out in p.outputs] == [
+        (str(tmp_path / "out" / "banner_pt.png"), str(tmp_path / "out" / "banner_pt.jpg")),
+        (str(tmp_path / "out_Dark" / "banner_pt.png"), str(tmp_path / "out_Dark" / "banner_pt.jpg")),
+    ]
+    themed = plan({"jobs": [{}]}, size=[64, 32], themes=["light", "dark"], outdir=str(tmp_path / "{theme}"))
+    assert [Path(out.png).parent.name for out in themed.outputs] == ["light", "dark"]
+
+
+def test_single_dark_theme_keeps_outdir(tmp_path):
+    # Same rule as the CLI: the _Dark suffix only separates themes rendered together
+    p = plan({"jobs": [{"theme": "dark"}]}, size=[64, 32], outdir=str(tmp_path / "out"))
+    assert [out.png for out in p.outputs] == [str(tmp_path / "out" / "banner.png")]
+    with pytest.raises(ValueError, match="Two batch outputs"):
+        plan({"jobs": [{}], "matrix": {"theme": ["light", "dark"]}}, size=[64, 32], outdir=str(tmp_path / "out"))
+
+
+def test_colliding_outputs_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Two batch outputs"):
+        plan({"jobs": [{"title": "A"}, {"title": "B"}]}, size=[64, 32], outdir=str(tmp_path))
+
+
+def test_unknown_theme_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown theme"):
+        plan({"jobs": [{"theme": "sepia"}]}, size=[64, 32], outdir=str(tmp_path))
+
+
+def test_incremental_run_skips_unchanged_outputs(tmp_path):
+    spec = {"jobs": [{"name": "a", "title": "A"}, {"name": "b", "title": "B"}]}
+    first = banner_batch.run_batch_incremental(plan(spec, size=[64, 32], outdir=str(tmp_path)))
+    assert sorted(os.path.basename(p) for p in first) == ["a.png", "b.png"]
+    assert banner_batch.run_batch_incremental(plan(spec, size=[64, 32], outdir=str(tmp_path))) == []
+
+    spec["jobs"][1]["title"] = "B2"
+    again = banner_batch.run_batch_incremental(plan(spec, size=[64, 32], outdir=str(tmp_path)))
+    assert [os.path.basename(p) for p in again] == ["b.png"]
@@ -0,0 +1,73 @@
+import pytest
+from PIL import Image, ImageDraw
+
+import banner_palette
+
+np = pytest.importorskip("numpy")
+
+
+def single_color():
+    return Image.new("RGBA", (64, 64), (200, 40, 90, 255))
+
+
+def palette_mode():
+    im = Image.new("P", (96, 48))
+    im.putpalette([255, 255, 255, 20, 90, 220, 240, 140, 20, 30, 160, 70] + [0] * (256 - 4) * 3)
+    draw = ImageDraw.Draw(im)
+    draw.rectangle((0, 0, 31, 47), fill=1)
+    draw.rectangle((32, 0, 63, 47), fill=2)
+    draw.rectangle((64, 0, 79, 47), fill=3)
+    return im
+
+
+def transparent_with_mark():
+    im = Image.new("RGBA", (80, 80), (0, 0, 0, 0))
+    ImageDraw.Draw(im).ellipse((10, 10, 70, 70), fill=(120, 30, 200, 255))
+    return im
+
+
+def grayscale():
+    return Image.linear_gradient("L").resize((64, 64))
+
+
+def rainbow():
+    im = Image.new("RGB", (120, 40))
+    draw = ImageDraw.Draw(im)
+    for i, color in enumerate([(230, 30, 30), (240, 200, 20), (30, 180, 60), (20, 120, 230), (150, 40, 200), (250, 120, 170)]):
+        draw.rectangle((20 * i, 0, 20 * i + 19, 39), fill=color)
+    return im
+
+
+def near_colors():
+    im = Image.new("RGB", (64, 32), (40, 100, 200))
+    ImageDraw.Draw(im).rectangle((32, 0, 63, 31), fill=(44, 104, 196))
+    return im
+
+
+LOGOS = [single_color, palette_mode, transparent_with_mark, grayscale, rainbow, near_colors]
+
+
+def test_numpy_and_python_pickers_choose_the_same_pair(monkeypatch):
+    palettes = [banner_palette.logo_palette_colors(make()) for make in LOGOS] + [None, []]
+    fast = banner_palette.pick_gradient_pairs(palettes)
+    monkeypatch.setattr(banner_palette, "np", None)
+    slow = banner_palette.pick_gradient_pairs(palettes)
+    assert fast == slow
+    # One usable colour (plain or on a transparent background) gives no pair, no colours the default one
+    assert [pair is None for pair in fast] == [True, False, True, False, False, False, True, False]
+    assert fast[-1] == tuple(banner_palette.PALETTE_FALLBACK_COLORS)
+
+
+@pytest.mark.parametrize("make", LOGOS)
+def test_pickers_agree_per_logo(monkeypatch, make):
+    colors = banner_palette.logo_palette_colors(make())
+    fast = banner_palette.pick_gradient_pairs([colors])
+    monkeypatch.setattr(banner_palette, "np", None)
+    assert banner_palette.pick_gradient_pairs([colors]) == fast
+
+
+def test_lab_conversions_agree():
+    colors = [(0, 0, 0), (255, 255, 255), (10, 10, 10), (11, 200, 37), (255, 0, 0), (34, 110, 255), (136, 58, 255)]
+    fast = banner_palette._srgb_to_lab_array(np.array(colors, dtype=np.uint8))
+    for color, lab in zip(colors, fast):
+        assert banner_palette._srgb_to_lab(color) == pytest.approx(tuple(lab), abs=1e-9)
@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+from PIL import Image
+
+import make_banner as mb
+
+
+def test_profiling_records_stages_and_restores_block_size():
+    block_size = Image.core.get_block_size()
+    with mb.profiling() as prof:
+        assert Image.core.get_block_size() == mb.StageProfiler.PROFILE_BLOCK_SIZE
+        mb.make_linear_gradient((64, 32), (0, 0, 0), (255, 255, 255), engine="pil")
+    assert Image.core.get_block_size() == block_size
+    assert "gradient.ramp" in prof.report()
+
+
+def test_profiling_cannot_be_nested():
+    with mb.profiling():
+        with pytest.raises(RuntimeError, match="already active"):
+            with mb.profiling():
+                pass
+    with mb.profiling():
+        pass
+
+
+def test_profiling_is_main_thread_only():
+    errors = []
+
+    def run():
+        try:
+            with mb.profiling():
+                pass
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert len(errors) == 1 and "main thread" in str(errors[0])
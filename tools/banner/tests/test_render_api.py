@@ -0,0 +1,37 @@
+import io
+import os
+from pathlib import Path
+
+from PIL import Image
+
+import make_banner as mb
+
+LOGO = str(Path(__file__).resolve().parents[3] / "assets" / "logo" / "wss_studio_art_logo.png")
+
+
+def cache_files():
+    root = Path(os.environ["BANNER_CACHE_DIR"])
+    return sorted(p.relative_to(root) for p in root.rglob("*")) if root.exists() else []
+
+
+def test_render_banner_leaves_disk_caches_alone():
+    request = mb.BannerRequest(size=(320, 168), logo_path=LOGO, formats=("png", "jpeg"))
+    result = mb.render_banner(request)
+    with Image.open(io.BytesIO(result.images["png"])) as im:
+        assert im.size == (320, 168)
+    assert mb.render_banner(request._replace(theme="dark")).images["png"]
+    assert cache_files() == []
+
+
+def test_render_banner_can_persist_caches():
+    mb.render_banner(mb.BannerRequest(size=(320, 168), logo_path=LOGO, persist_caches=True))
+    files = {str(p) for p in cache_files()}
+    assert {"palette_cache.json", "logo_variants"} <= files
+
+
+def test_library_renders_leave_disk_caches_alone(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    mb.build_banner("Conecta", "Libras", LOGO, output=str(out / "banner.png"), size=(320, 168))
+    assert (out / "banner.png").exists()
+    assert cache_files() == []
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont, features
+
+import make_banner as mb
+
+TITLES = ["Conecta Libras", "Comunicação inclusiva sem barreiras", "W", "iiii"]
+
+
+def linear_fit(draw, text, target_width, max_size, min_size):
+    # The original scan: step down by 2 and take the first size that fits
+    size = max_size
+    while size >= min_size:
+        font = mb.find_font([], size)
+        bbox = draw.textbbox((0, 0), text, font=font)
+        if bbox[2] - bbox[0] <= target_width:
+            return font
+        size -= 2
+    return mb.find_font([], min_size)
+
+
+@pytest.mark.skipif(not features.check("freetype2"), reason="Pillow built without FreeType")
+@pytest.mark.parametrize("title", TITLES)
+@pytest.mark.parametrize("target_width", [0, 40, 180, 420, 900, 5000])
+@pytest.mark.parametrize("max_size, min_size", [(96, 18), (95, 18), (40, 40)])
+def test_fit_text_matches_linear_scan(monkeypatch, title, target_width, max_size, min_size):
+    # Pillow's scalable default font, so widths vary with size without system fonts
+    monkeypatch.setattr(mb, "find_font", lambda preferences, size: ImageFont.load_default(size))
+    draw = ImageDraw.Draw(Image.new("RGB", (8, 8)))
+    fitted = mb.fit_text(draw, title, target_width, [], max_size, min_size)
+    assert fitted.size == linear_fit(draw, title, target_width, max_size, min_size).size
+
+
+def test_deleted_font_is_dropped_from_index(tmp_path):
+    # The index is only read and written back with the on-disk caches on
+    with mb.persistent_caches():
+        fonts = tmp_path / "fonts"
+        fonts.mkdir()
+        for name in ("Keep.ttf", "Gone.ttf"):
+            (fonts / name).write_bytes(b"not a real font")
+        index_path = tmp_path / "font_index.json"
+        registry = mb.FontRegistry(index_path=index_path, font_dirs=[str(fonts)])
+        assert registry.lookup("gone") == str(fonts / "Gone.ttf")
+
+        # Keep the directory mtime, as on file systems with coarse timestamps
+        stamp = os.stat(fonts).st_mtime_ns
+        os.remove(fonts / "Gone.ttf")
+        os.utime(fonts, ns=(stamp, stamp))
+
+        assert registry.lookup("gone") is None
+        assert registry.lookup("keep") == str(fonts / "Keep.ttf")
+        fresh = mb.FontRegistry(index_path=index_path, font_dirs=[str(fonts)])
+        assert fresh.lookup("Gone.ttf") is None
+        assert "gone.ttf" not in fresh.index